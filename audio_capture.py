@@ -1,7 +1,6 @@
 """音频捕获模块 - 处理本机/网络音频的录制和流式传输"""
 import threading
 import time
-import queue
 import warnings
 from collections import deque
 from typing import Optional
@@ -23,6 +22,8 @@ if sc is not None:
 
 _warned_missing_soundcard = False
 
+_EMPTY_FLOAT32 = np.zeros(0, dtype=np.float32)
+
 
 def _microphone_name(device) -> str:
     return str(getattr(device, "name", "") or "").strip()
@@ -140,11 +141,97 @@ def list_output_devices() -> dict:
     }
 
 
+class _AudioRingBuffer:
+    """定长 float32 环形缓冲区
+
+    用读写帧计数代替 deque[np.ndarray] + np.concatenate 的数组拼接，
+    写满时自动丢弃最旧的帧。仅供单生产者/单消费者场景使用。
+    """
+
+    def __init__(self, capacity: int):
+        self._capacity = max(1, int(capacity))
+        self._buf = np.empty(self._capacity, dtype=np.float32)
+        self._read = 0
+        self._write = 0
+
+    def __len__(self) -> int:
+        return self._write - self._read
+
+    def write(self, data: np.ndarray) -> None:
+        """写入数据；空间不足时丢弃最旧的帧"""
+        length = int(data.size)
+        if length == 0:
+            return
+        if length >= self._capacity:
+            data = data[-self._capacity:]
+            length = self._capacity
+
+        free = self._capacity - len(self)
+        if length > free:
+            self.drop(length - free)
+
+        pos = self._write % self._capacity
+        first = min(length, self._capacity - pos)
+        self._buf[pos:pos + first] = data[:first]
+        if first < length:
+            self._buf[:length - first] = data[first:]
+        self._write += length
+
+    def read(self, length: int, out: np.ndarray) -> int:
+        """读取最多 length 帧到 out，返回实际读取帧数"""
+        length = min(int(length), len(self))
+        if length <= 0:
+            return 0
+        pos = self._read % self._capacity
+        first = min(length, self._capacity - pos)
+        out[:first] = self._buf[pos:pos + first]
+        if first < length:
+            out[first:length] = self._buf[:length - first]
+        self._read += length
+        return length
+
+    def drop(self, length: int) -> None:
+        """丢弃最旧的 length 帧"""
+        self._read += min(max(0, int(length)), len(self))
+
+
+class _PcmInt16Converter:
+    """float32 → int16 PCM 转换器，复用预分配缓冲区避免逐块临时数组
+
+    multiply/clip/copyto 走 numpy 的 ufunc 内核，运行时按 CPU 自动派发
+    SIMD 指令（x86 上为 SSE/AVX2，ARM64/Apple Silicon 上为 NEON），
+    无需自带平台相关的 C 扩展。
+    """
+
+    def __init__(self):
+        self._f32_buf = np.empty(0, dtype=np.float32)
+        self._i16_buf = np.empty(0, dtype=np.int16)
+
+    def convert(self, channel_data: np.ndarray) -> bytes:
+        """将浮点音频数据转换为独立的 int16 字节串（单次遍历，复用中间缓冲区）
+
+        必须返回自有的 bytes 而不是内部缓冲区的视图：下游的
+        AudioSendRouter 在断流/休眠预滚时会原样缓存 payload 对象，
+        视图会被下一次 convert 覆写，重连后 flush 出的就是重复的最新块。
+        中间的 float32/int16 缓冲区仍然复用，只有最后这一次拷贝不可省。
+        """
+        length = int(channel_data.shape[0])
+        if self._f32_buf.shape[0] < length:
+            self._f32_buf = np.empty(length, dtype=np.float32)
+            self._i16_buf = np.empty(length, dtype=np.int16)
+
+        scaled = self._f32_buf[:length]
+        np.multiply(channel_data, 32767.0, out=scaled)
+        np.clip(scaled, -32767.0, 32767.0, out=scaled)
+
+        converted = self._i16_buf[:length]
+        np.copyto(converted, scaled, casting="unsafe")
+        return converted.tobytes()
+
+
 def _convert_float32_to_int16(channel_data: np.ndarray) -> bytes:
-    """将浮点音频数据转换为int16字节流"""
-    clipped = np.clip(channel_data, -1.0, 1.0)
-    data_int16 = (clipped * 32767).astype(np.int16)
-    return data_int16.tobytes()
+    """将浮点音频数据转换为int16字节流（一次性调用，无缓冲区复用）"""
+    return _PcmInt16Converter().convert(channel_data)
 
 
 class AudioStreamer:
@@ -178,6 +265,9 @@ class AudioStreamer:
         self._mute_state_lock = threading.Lock()
         self._mute_mic_when_vrchat_muted = bool(mute_mic_when_vrchat_muted)
         self._vrchat_mic_muted = False
+        self._pcm_converter = _PcmInt16Converter()
+        self._resample_cache: dict[tuple[int, int], tuple[np.ndarray, np.ndarray]] = {}
+        self._loopback_cache: dict[str, object] = {}
 
     def set_vrchat_mic_muted(self, muted: bool) -> None:
         with self._mute_state_lock:
@@ -294,10 +384,14 @@ class AudioStreamer:
                     if channel_data.size == 0:
                         continue
 
-                    normalized = self._resample_to_chunk(channel_data, self.chunk_size)
+                    # recorder 已按 16 kHz 打开，帧长正确时直接走快路径
+                    if channel_data.size == self.chunk_size:
+                        normalized = channel_data
+                    else:
+                        normalized = self._resample_to_chunk(channel_data, self.chunk_size)
                     if source == "microphone" and self._should_mute_microphone_component():
                         normalized = np.zeros_like(normalized, dtype=np.float32)
-                    payload = _convert_float32_to_int16(normalized)
+                    payload = self._pcm_converter.convert(normalized)
                     try:
                         self.ws.send(payload)
                     except Exception as send_error:
@@ -306,32 +400,38 @@ class AudioStreamer:
                         return
         except Exception as capture_error:
             print(f"Error capturing audio from {source}: {capture_error}")
+            self._loopback_cache.clear()
             time.sleep(0.5)
 
     def _run_mix_mode(self) -> None:
-        system_queue: queue.Queue[np.ndarray] = queue.Queue(maxsize=4)
-        microphone_queue: queue.Queue[np.ndarray] = queue.Queue(maxsize=4)
+        # deque.append/popleft 在 CPython 里是原子操作，配合 maxlen 自动
+        # 丢最旧块，单生产者/单消费者下无需 queue.Queue 的锁和条件变量
+        system_chunks: deque[np.ndarray] = deque(maxlen=4)
+        microphone_chunks: deque[np.ndarray] = deque(maxlen=4)
+        data_ready = threading.Event()
         local_stop_event = threading.Event()
 
         system_thread = threading.Thread(
             target=self._capture_worker,
-            args=("system", system_queue, local_stop_event, self.mix_capture_frames),
+            args=("system", system_chunks, data_ready, local_stop_event, self.mix_capture_frames),
             name="AudioCaptureSystem",
             daemon=True,
         )
         microphone_thread = threading.Thread(
             target=self._capture_worker,
-            args=("microphone", microphone_queue, local_stop_event, self.mix_capture_frames),
+            args=("microphone", microphone_chunks, data_ready, local_stop_event, self.mix_capture_frames),
             name="AudioCaptureMicrophone",
             daemon=True,
         )
         mixer_thread = threading.Thread(
             target=self._mix_and_send_worker,
-            args=(system_queue, microphone_queue, local_stop_event),
+            args=(system_chunks, microphone_chunks, data_ready, local_stop_event),
             name="AudioMixSender",
             daemon=True,
         )
 
+        # 三个工作线程的阻塞点（recorder.record 的设备等待、ws.send 的
+        # socket 写入）都在 C 层释放 GIL，Python 侧无需额外处理并行。
         print("🎛️  Capturing mixed audio: system + microphone")
         print(f"🎚️  Mix gains -> microphone(self): {self.mix_mic_gain:.2f}, system(other): {self.mix_system_gain:.2f}")
 
@@ -353,7 +453,8 @@ class AudioStreamer:
     def _capture_worker(
         self,
         source: str,
-        out_queue: "queue.Queue[np.ndarray]",
+        out_chunks: "deque[np.ndarray]",
+        data_ready: threading.Event,
         local_stop_event: threading.Event,
         capture_frames: int,
     ) -> None:
@@ -377,162 +478,96 @@ class AudioStreamer:
                     if channel_data.size == 0:
                         continue
 
-                    payload = channel_data.astype(np.float32, copy=False)
-                    try:
-                        out_queue.put_nowait(payload)
-                    except queue.Full:
-                        try:
-                            out_queue.get_nowait()
-                        except queue.Empty:
-                            pass
-                        try:
-                            out_queue.put_nowait(payload)
-                        except queue.Full:
-                            pass
+                    # _extract_mono_channel 已保证 float32，无需再转换
+                    out_chunks.append(channel_data)
+                    data_ready.set()
         except Exception as capture_error:
             print(f"Error capturing audio from {source}: {capture_error}")
+            self._loopback_cache.clear()
             local_stop_event.set()
 
     def _mix_and_send_worker(
         self,
-        system_queue: "queue.Queue[np.ndarray]",
-        microphone_queue: "queue.Queue[np.ndarray]",
+        system_chunks: "deque[np.ndarray]",
+        microphone_chunks: "deque[np.ndarray]",
+        data_ready: threading.Event,
         local_stop_event: threading.Event,
     ) -> None:
-        system_segments: deque[np.ndarray] = deque()
-        microphone_segments: deque[np.ndarray] = deque()
-        system_available = 0
-        microphone_available = 0
         min_mix_frames = max(1, int(self.chunk_size))
         max_buffer_frames = min_mix_frames * 3
         max_source_skew_frames = min_mix_frames
 
+        # 环形缓冲区写满自动丢最旧帧，容量即原先的 max_buffer_frames 上限
+        system_ring = _AudioRingBuffer(max_buffer_frames)
+        microphone_ring = _AudioRingBuffer(max_buffer_frames)
+        system_buf = np.empty(min_mix_frames, dtype=np.float32)
+        microphone_buf = np.empty(min_mix_frames, dtype=np.float32)
+        mix_buf = np.empty(min_mix_frames, dtype=np.float32)
+        mix_scratch = np.empty(min_mix_frames, dtype=np.float32)
+        send_buf = bytearray()
+
         while not self._stop_event.is_set() and not self._source_changed_event.is_set() and not local_stop_event.is_set():
-            try:
-                captured_system = system_queue.get(timeout=0.02)
+            data_ready.clear()
+
+            while system_chunks:
+                captured_system = system_chunks.popleft()
                 if captured_system is not None and captured_system.size > 0:
-                    normalized = captured_system.astype(np.float32, copy=False)
-                    system_segments.append(normalized)
-                    system_available += int(normalized.size)
-            except queue.Empty:
-                pass
+                    system_ring.write(captured_system)
 
-            try:
-                captured_microphone = microphone_queue.get(timeout=0.02)
+            while microphone_chunks:
+                captured_microphone = microphone_chunks.popleft()
                 if captured_microphone is not None and captured_microphone.size > 0:
-                    normalized = captured_microphone.astype(np.float32, copy=False)
-                    microphone_segments.append(normalized)
-                    microphone_available += int(normalized.size)
-            except queue.Empty:
-                pass
-
-            if system_available > max_buffer_frames:
-                drop_len = system_available - max_buffer_frames
-                system_segments, system_available = self._drop_old_frames(system_segments, system_available, drop_len)
-
-            if microphone_available > max_buffer_frames:
-                drop_len = microphone_available - max_buffer_frames
-                microphone_segments, microphone_available = self._drop_old_frames(microphone_segments, microphone_available, drop_len)
+                    microphone_ring.write(captured_microphone)
 
+            system_available = len(system_ring)
+            microphone_available = len(microphone_ring)
             if system_available - microphone_available > max_source_skew_frames:
-                drop_len = (system_available - microphone_available) - max_source_skew_frames
-                system_segments, system_available = self._drop_old_frames(system_segments, system_available, drop_len)
+                system_ring.drop((system_available - microphone_available) - max_source_skew_frames)
             elif microphone_available - system_available > max_source_skew_frames:
-                drop_len = (microphone_available - system_available) - max_source_skew_frames
-                microphone_segments, microphone_available = self._drop_old_frames(microphone_segments, microphone_available, drop_len)
+                microphone_ring.drop((microphone_available - system_available) - max_source_skew_frames)
 
-            if system_available < min_mix_frames or microphone_available < min_mix_frames:
+            if len(system_ring) < min_mix_frames or len(microphone_ring) < min_mix_frames:
+                data_ready.wait(timeout=0.05)
                 continue
 
-            mix_len = min(min_mix_frames, system_available, microphone_available)
-            system_data, system_segments, system_available = self._consume_segments(system_segments, system_available, mix_len)
-            microphone_data, microphone_segments, microphone_available = self._consume_segments(microphone_segments, microphone_available, mix_len)
+            # 积压时把多个块合并成一次 ws.send，摊薄每帧的发送开销；
+            # 环形缓冲区容量为 3 个块，内层循环有界
+            send_buf.clear()
+            while len(system_ring) >= min_mix_frames and len(microphone_ring) >= min_mix_frames:
+                system_ring.read(min_mix_frames, system_buf)
+                microphone_ring.read(min_mix_frames, microphone_buf)
 
-            if self._should_mute_microphone_component():
-                microphone_data = np.zeros_like(microphone_data, dtype=np.float32)
+                # 混音全程写入预分配缓冲区；麦克风静音时直接跳过叠加。
+                # 溢出交给转换器的饱和裁剪处理，这里不再做峰值缩放
+                mixed = mix_buf
+                np.multiply(system_buf, self.mix_system_gain, out=mixed)
+                if not self._should_mute_microphone_component():
+                    np.multiply(microphone_buf, self.mix_mic_gain, out=mix_scratch)
+                    mixed += mix_scratch
 
-            mixed = (system_data * self.mix_system_gain) + (microphone_data * self.mix_mic_gain)
-            peak = float(np.max(np.abs(mixed))) if mixed.size else 0.0
-            if peak > 0.98:
-                mixed = mixed * (0.98 / peak)
+                send_buf += self._pcm_converter.convert(mixed)
 
-            payload = _convert_float32_to_int16(mixed)
             try:
-                self.ws.send(payload)
+                # 发不可变拷贝：路由器断流时会原样缓存 payload 对象，
+                # 传 send_buf 本身会在下一轮 clear/重填时把缓存的块改掉
+                self.ws.send(bytes(send_buf))
             except Exception as send_error:
                 print(f"Error sending mixed audio data: {send_error}")
                 local_stop_event.set()
                 self._stop_event.set()
                 return
 
-    def _consume_segments(
-        self,
-        segments: "deque[np.ndarray]",
-        available: int,
-        length: int,
-    ) -> tuple[np.ndarray, "deque[np.ndarray]", int]:
-        if length <= 0:
-            return np.zeros(0, dtype=np.float32), segments, available
-
-        remaining = int(length)
-        parts: list[np.ndarray] = []
-
-        while remaining > 0 and segments:
-            head = segments[0]
-            head_len = int(head.size)
-
-            if head_len <= remaining:
-                parts.append(head)
-                segments.popleft()
-                remaining -= head_len
-                available -= head_len
-                continue
-
-            parts.append(head[:remaining])
-            segments[0] = head[remaining:]
-            available -= remaining
-            remaining = 0
-
-        if not parts:
-            return np.zeros(0, dtype=np.float32), segments, available
-
-        if len(parts) == 1:
-            return parts[0], segments, available
-
-        return np.concatenate(parts), segments, available
-
-    def _drop_old_frames(
-        self,
-        segments: "deque[np.ndarray]",
-        available: int,
-        length: int,
-    ) -> tuple["deque[np.ndarray]", int]:
-        remaining = max(0, int(length))
-        if remaining <= 0:
-            return segments, available
-
-        while remaining > 0 and segments:
-            head = segments[0]
-            head_len = int(head.size)
-            if head_len <= remaining:
-                segments.popleft()
-                available -= head_len
-                remaining -= head_len
-                continue
-
-            segments[0] = head[remaining:]
-            available -= remaining
-            remaining = 0
-
-        return segments, max(0, available)
-
     def _extract_mono_channel(self, data: np.ndarray) -> np.ndarray:
+        """提取单声道数据。尽量返回输入缓冲区上的视图，不做拷贝"""
         if data is None:
-            return np.zeros(0, dtype=np.float32)
+            return _EMPTY_FLOAT32
 
-        arr = np.asarray(data, dtype=np.float32)
+        if isinstance(data, np.ndarray) and data.dtype == np.float32:
+            arr = data
+        else:
+            arr = np.asarray(data, dtype=np.float32)
         if arr.size == 0:
-            return np.zeros(0, dtype=np.float32)
+            return _EMPTY_FLOAT32
 
         if arr.ndim == 1:
             return arr
@@ -540,6 +575,13 @@ class AudioStreamer:
         return arr[:, 0]
 
     def _resample_to_chunk(self, data: Optional[np.ndarray], target_length: int) -> np.ndarray:
+        """把一段数据拉伸/压缩到 target_length。
+
+        这里只是长度修正（recorder 偶尔返回不等长的帧），采样率本身在
+        recorder 创建时就已指定为 16 kHz，因此线性插值足够；带抗混叠
+        滤波的多相重采样（scipy.signal.resample_poly）对这个场景是
+        多余的依赖。
+        """
         if data is None:
             return np.zeros(target_length, dtype=np.float32)
 
@@ -553,9 +595,23 @@ class AudioStreamer:
             value = float(arr[0]) if current_length == 1 else 0.0
             return np.full(target_length, value, dtype=np.float32)
 
-        source_axis = np.linspace(0.0, 1.0, num=current_length, dtype=np.float32)
-        target_axis = np.linspace(0.0, 1.0, num=target_length, dtype=np.float32)
-        return np.interp(target_axis, source_axis, arr).astype(np.float32)
+        # 线性插值全程保持 float32：np.interp 会提升到 float64 再转回，
+        # 这里直接按采样点位置做向量化 gather + lerp。
+        # base/frac 只依赖长度对，缓存起来避免每帧重建 linspace。
+        cache_key = (current_length, target_length)
+        cached = self._resample_cache.get(cache_key)
+        if cached is None:
+            positions = np.linspace(0.0, float(current_length - 1), num=target_length, dtype=np.float32)
+            base = np.minimum(positions.astype(np.int32), current_length - 2)
+            frac = positions - base.astype(np.float32)
+            if len(self._resample_cache) >= 32:
+                self._resample_cache.clear()
+            self._resample_cache[cache_key] = (base, frac)
+        else:
+            base, frac = cached
+        left = arr[base]
+        right = arr[base + 1]
+        return left + (right - left) * frac
 
     def _create_recorder(self, source: str):
         """根据音频源创建对应的recorder上下文"""
@@ -574,10 +630,18 @@ class AudioStreamer:
                     print("⚠️  No default speaker available for system audio capture")
                     return None
 
-                loopback = sc.get_microphone(id=str(speaker.name), include_loopback=True)
+                # include_loopback=True 的查找会重新枚举全部端点，按扬声器
+                # 缓存结果；捕获出错时缓存会被整体丢弃
+                speaker_key = self._device_id(speaker) or str(speaker.name)
+                loopback = self._loopback_cache.get(speaker_key)
                 if loopback is None:
-                    print("⚠️  Loopback capture is not available on this device")
-                    return None
+                    loopback = sc.get_microphone(id=str(speaker.name), include_loopback=True)
+                    if loopback is None:
+                        print("⚠️  Loopback capture is not available on this device")
+                        return None
+                    if len(self._loopback_cache) >= 8:
+                        self._loopback_cache.clear()
+                    self._loopback_cache[speaker_key] = loopback
 
                 print(f"🔊 Capturing system audio from: {speaker.name}")
                 return loopback.recorder(samplerate=self.sample_rate, channels=1)
@@ -221,7 +221,10 @@ class EnergySilenceDetector:
         if not pcm_bytes:
             return False
 
-        usable_length = len(pcm_bytes) - (len(pcm_bytes) % self.sample_width_bytes)
+        # Normalize to a byte view first: callers may hand in bytes, bytearray
+        # or another buffer, and the length math below must count bytes.
+        view = memoryview(pcm_bytes).cast("B")
+        usable_length = len(view) - (len(view) % self.sample_width_bytes)
         if usable_length <= 0:
             return False
 
@@ -229,7 +232,7 @@ class EnergySilenceDetector:
         if sample_count <= 0:
             return False
 
-        samples = memoryview(pcm_bytes[:usable_length]).cast("h")
+        samples = view[:usable_length].cast("h")
         square_sum = sum(int(sample) * int(sample) for sample in samples)
         rms = math.sqrt(square_sum / sample_count)
         threshold = max(self.min_speech_rms, self.noise_floor * 3.0)
@@ -1,12 +1,13 @@
 """
 Configuration file - stores all configuration options and constants.
 """
+import functools
+import itertools
 import json
 import os
+import re
 import sys
-import locale
 import time
-import threading
 from urllib.parse import urlencode
 import requests
 from dotenv import load_dotenv
@@ -17,18 +18,18 @@ from dotenv import load_dotenv
 # The active set/list is selected by TRANSLATION_PROVIDER (resolved further below).
 
 # Soniox-supported languages (ISO 639-1). Source: docs/supported-languages.mdx
-SONIOX_SUPPORTED_LANGUAGE_CODES = {
+SONIOX_SUPPORTED_LANGUAGE_CODES = frozenset({
     "af", "sq", "ar", "az", "eu", "be", "bn", "bs", "bg", "ca",
     "zh", "hr", "cs", "da", "nl", "en", "et", "fi", "fr", "gl",
     "de", "el", "gu", "he", "hi", "hu", "id", "it", "ja", "kn",
     "kk", "ko", "lv", "lt", "mk", "ms", "ml", "mr", "no", "fa",
     "pl", "pt", "pa", "ro", "ru", "sr", "sk", "sl", "es", "sw",
     "sv", "tl", "ta", "te", "th", "tr", "uk", "ur", "vi", "cy",
-}
+})
 
 # Gemini Live Translation supported languages (normalized to primary subtag).
 # Source: https://ai.google.dev/gemini-api/docs/live-api/live-translate
-GEMINI_SUPPORTED_LANGUAGE_CODES = {
+GEMINI_SUPPORTED_LANGUAGE_CODES = frozenset({
     "af", "ak", "sq", "am", "ar", "hy", "az", "eu", "be", "bn",
     "bg", "my", "ca", "zh", "hr", "cs", "da", "nl", "en", "et",
     "fil", "fi", "fr", "gl", "ka", "de", "el", "gu", "ha", "he",
@@ -39,7 +40,7 @@ GEMINI_SUPPORTED_LANGUAGE_CODES = {
     "th", "tr", "uk", "ur", "uz", "vi", "zu",
     # Legacy alias kept for backward compatibility (mapped to "fil" for Gemini)
     "tl",
-}
+})
 
 # Ordered language-code lists used to drive the frontend dropdown. The display
 # codes can carry meaningful BCP-47 variants (e.g. Gemini splits zh into
@@ -80,6 +81,12 @@ GEMINI_BCP47_PASSTHROUGH = {"zh-hans": "zh-Hans", "zh-hant": "zh-Hant", "pt-br":
 _TRADITIONAL_CHINESE_LOCALES = {"zh_tw", "zh_hk", "zh_mo", "zh-tw", "zh-hk", "zh-mo"}
 
 
+# Language codes are the leading alphabetic run ('zh' in 'zh_CN', 'en' in
+# 'en-US'); one anchored match replaces the strip/lower/split chain.
+_LANG_PREFIX_RE = re.compile(r"[A-Za-z]+")
+
+
+@functools.lru_cache(maxsize=512)
 def normalize_language_code(lang: str) -> str:
     """Normalize language code to ISO 639-1 lowercase where possible.
 
@@ -88,19 +95,10 @@ def normalize_language_code(lang: str) -> str:
     - 'en-US' -> 'en'
     - ' JA '  -> 'ja'
     """
-    if lang is None:
-        return ""
-    value = str(lang).strip().lower()
-    if not value:
+    if not lang:
         return ""
-
-    # common separators
-    for sep in ("_", "-"):
-        if sep in value:
-            value = value.split(sep, 1)[0]
-            break
-
-    return value
+    match = _LANG_PREFIX_RE.match(str(lang).lstrip())
+    return match.group(0).lower() if match else ""
 
 
 def canonicalize_language_code(lang: str) -> str:
@@ -143,8 +141,8 @@ def get_language_codes_ordered(provider: str | None = None) -> list:
 
 
 def is_supported_language_code(lang: str, provider: str | None = None) -> bool:
-    code = normalize_language_code(lang)
-    return bool(code) and code in get_supported_language_codes(provider)
+    # The empty string is never in the supported sets, so no truthiness guard.
+    return normalize_language_code(lang) in get_supported_language_codes(provider)
 
 
 def canonicalize_target_lang(lang: str, provider: str | None = None) -> str:
@@ -210,9 +208,14 @@ def describe_target_language(lang: str) -> str:
 # Load .env here so env vars are available when other modules import this config.
 load_dotenv()
 
+# Snapshot the environment once: the _env_* helpers below only run while this
+# module executes, and each os.environ lookup goes through the os module's
+# case-mangling wrapper. A plain dict keeps the ~30 startup reads cheap.
+_ENV = dict(os.environ)
+
 
 def _env_bool(name: str, default: bool) -> bool:
-    value = os.environ.get(name)
+    value = _ENV.get(name)
     if value is None:
         return default
     value = str(value).strip().lower()
@@ -225,7 +228,7 @@ def _env_bool(name: str, default: bool) -> bool:
 
 def _env_optional_bool(name: str) -> bool | None:
     """Parse an optional boolean env var. Returns None when unset/unrecognized."""
-    value = os.environ.get(name)
+    value = _ENV.get(name)
     if value is None:
         return None
     value = str(value).strip().lower()
@@ -249,7 +252,7 @@ def _derive_sleep_on_silence(uses_temp: bool, override: bool | None) -> bool:
 
 
 def _env_int(name: str, default: int) -> int:
-    value = os.environ.get(name)
+    value = _ENV.get(name)
     if value is None:
         return default
     try:
@@ -259,7 +262,7 @@ def _env_int(name: str, default: int) -> int:
 
 
 def _env_float(name: str, default: float) -> float:
-    value = os.environ.get(name)
+    value = _ENV.get(name)
     if value is None:
         return default
     try:
@@ -269,7 +272,7 @@ def _env_float(name: str, default: float) -> float:
 
 
 def _env_optional_float(name: str) -> float | None:
-    value = os.environ.get(name)
+    value = _ENV.get(name)
     if value is None or str(value).strip() == "":
         return None
     try:
@@ -280,7 +283,7 @@ def _env_optional_float(name: str) -> float | None:
 
 
 def _env_str(name: str, default: str) -> str:
-    value = os.environ.get(name)
+    value = _ENV.get(name)
     return default if value is None else str(value)
 
 
@@ -291,7 +294,7 @@ def _env_json(name: str, default: dict | None = None) -> dict:
     """
     if default is None:
         default = {}
-    value = os.environ.get(name)
+    value = _ENV.get(name)
     if not value:
         return default
     try:
@@ -695,6 +698,13 @@ FFMPEG_PATH = _env_str("FFMPEG_PATH", "ffmpeg")
 SERVER_HOST = _env_str("SERVER_HOST", "0.0.0.0")
 SERVER_PORT = _env_int("SERVER_PORT", 8080)
 
+# Optional send/receive buffer size (bytes) for the listening socket.
+# Accepted connections inherit it on Linux; 0 keeps the kernel default.
+SERVER_SOCKET_BUFFER_BYTES = _env_int("SERVER_SOCKET_BUFFER_BYTES", 0)
+
+# Listen backlog; 0 uses the OS maximum (socket.SOMAXCONN)
+LISTEN_BACKLOG = _env_int("LISTEN_BACKLOG", 0)
+
 # LLM (OpenAI-compatible) config: used for minimal edits on completed translated segments.
 # Notes:
 # - LLM_BASE_URL example: https://openrouter.ai/api/v1
@@ -756,15 +766,14 @@ def _parse_llm_api_keys(raw: str) -> list[str]:
         """
         if raw is None:
                 return []
-        parts = [p.strip() for p in str(raw).split(",")]
-        # Filter empties and common placeholder values.
-        keys = [p for p in parts if p and p != "LLM_API_KEY"]
-        return keys
+        # One pass: strip, then drop empties and the common placeholder value.
+        return [key for key in (part.strip() for part in str(raw).split(",")) if key and key != "LLM_API_KEY"]
 
 
 _LLM_API_KEYS: list[str] = _parse_llm_api_keys(LLM_API_KEY)
-_LLM_API_KEY_LOCK = threading.Lock()
-_LLM_API_KEY_INDEX = 0
+# next() on a C-implemented iterator is atomic under the GIL, so round-robin
+# selection needs no lock.
+_LLM_API_KEY_CYCLE = itertools.cycle(_LLM_API_KEYS) if len(_LLM_API_KEYS) > 1 else None
 
 
 def get_llm_api_key() -> str:
@@ -772,18 +781,12 @@ def get_llm_api_key() -> str:
 
     Supports multiple keys via comma-separated LLM_API_KEY and returns them in round-robin.
     """
-    global _LLM_API_KEY_INDEX
-
     keys = _LLM_API_KEYS
     if not keys:
         return ""
     if len(keys) == 1:
         return keys[0]
-
-    with _LLM_API_KEY_LOCK:
-        key = keys[_LLM_API_KEY_INDEX % len(keys)]
-        _LLM_API_KEY_INDEX += 1
-        return key
+    return next(_LLM_API_KEY_CYCLE)
 
 
 def get_llm_api_keys() -> list[str]:
@@ -888,6 +891,34 @@ def get_resource_path(relative_path):
     return os.path.join(os.path.abspath('.'), relative_path)
 
 
+def _detect_system_locale() -> str:
+    """Best-effort system locale string (e.g. 'zh_CN', 'en-US').
+
+    Avoids locale.getdefaultlocale(), which is deprecated since Python 3.11
+    and re-parses the environment through a regex on every call. POSIX
+    platforms are covered by a direct env scan; Windows asks the Win32 API
+    for the UI language name.
+    """
+    for var in ("LC_ALL", "LC_CTYPE", "LANG", "LANGUAGE"):
+        value = os.environ.get(var)
+        if value:
+            value = value.split(":")[0].split(".")[0].strip()
+            if value and value not in ("C", "POSIX"):
+                return value
+    if sys.platform == "win32":
+        try:
+            import ctypes
+
+            kernel32 = ctypes.windll.kernel32
+            lcid = kernel32.GetUserDefaultUILanguage()
+            buf = ctypes.create_unicode_buffer(85)  # LOCALE_NAME_MAX_LENGTH
+            if kernel32.LCIDToLocaleName(lcid, buf, len(buf), 0):
+                return buf.value  # e.g. 'zh-CN'
+        except Exception:
+            pass
+    return ""
+
+
 def get_system_language(provider: str | None = None) -> str:
     """
     Get the system language code for the active provider.
@@ -896,8 +927,7 @@ def get_system_language(provider: str | None = None) -> str:
     """
     p = provider or TRANSLATION_PROVIDER
     try:
-        # Get system locale
-        system_locale = locale.getdefaultlocale()[0]  # e.g. 'zh_CN', 'en_US', 'ja_JP'
+        system_locale = _detect_system_locale()  # e.g. 'zh_CN', 'en_US', 'ja_JP'
 
         if system_locale:
             if p == "gemini":
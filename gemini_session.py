@@ -9,7 +9,8 @@ import re
 import concurrent.futures
 import logging
 import uuid
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
 from typing import Any, Optional, Tuple
 
 from websockets import ConnectionClosed, ConnectionClosedOK
@@ -60,6 +61,7 @@ from audio_capture import AudioStreamer
 from osc_manager import osc_manager
 from osc_draft import OscDraftPublisher
 from llm_client import LlmConfig, chat_completion, extract_answer_tag, LlmError
+from llm_client import prewarm as llm_prewarm
 from hosted_llm import HostedLlmTransport, HostedLlmError, HostedLlmDisabled
 import sentence_segmentation
 import llm_refine
@@ -184,6 +186,21 @@ class _RealtimeSilenceSender:
             self._stop_event.wait(delay)
 
 
+@dataclass(slots=True)
+class _SpeakerSentenceBuffer:
+    """单个说话人正在累积的句子 token。
+
+    固定形状的结构体；属性访问比 dict["key"] 少一次哈希查找，
+    而这两个字段在每个 token 上都要摸一遍。
+    """
+    original_tokens: list[dict] = field(default_factory=list)
+    translation_tokens: list[dict] = field(default_factory=list)
+    # 与 token 列表平行的纯文本列表，追加时填充；拼整句文本时一次 join
+    # 就够，不用每次把所有 token dict 再走一遍
+    original_texts: list[str] = field(default_factory=list)
+    translation_texts: list[str] = field(default_factory=list)
+
+
 @dataclass
 class _StreamState:
     ws: Any
@@ -269,7 +286,7 @@ class GeminiSession:
         self._stream_close_lock = threading.Lock()
         self._vrchat_self_muted = False
         self.osc_translation_enabled = False
-        self._sentence_buffers: dict[str, dict] = {}
+        self._sentence_buffers: dict[str, _SpeakerSentenceBuffer] = {}
         # Speakers whose translation for the current sentence already ended (with
         # sentence-ending punctuation) but whose source hasn't caught up yet. The
         # line break is deferred until the source is also sentence-complete, so
@@ -281,7 +298,10 @@ class GeminiSession:
         self._llm_sentence_session_id = f"llm-{time.time_ns()}"
         self._llm_sentence_counter = 0
         self._osc_live_last_text_by_speaker: dict[str, str] = {}
-        self._refine_context_history: list[dict] = []
+        # 有界 deque：append 时自动淘汰最旧条目，省去每句一次的切片重建
+        self._refine_context_history: deque[dict] = deque(
+            maxlen=max(1, int(config.llm_context_bounds()[1]))
+        )
         self._llm_context_cycle_count = int(LLM_REFINE_CONTEXT_MIN_COUNT)
         default_mode = str(LLM_REFINE_DEFAULT_MODE or "").strip().lower()
         if default_mode not in LLM_REFINE_MODES:
@@ -367,6 +387,20 @@ class GeminiSession:
             except Exception as error:
                 print(f"⚠️  Failed to start OSC listener for MuteSelf: {error}")
 
+        # 提前与 LLM 端点建立 keep-alive 连接，避免首次润色请求承担完整握手延迟
+        if self.loop and not config.llm_is_hosted() and (LLM_BASE_URL or "").strip():
+            try:
+                asyncio.run_coroutine_threadsafe(
+                    llm_prewarm(LlmConfig(
+                        base_url=(LLM_BASE_URL or "").strip(),
+                        api_key=get_llm_api_key(),
+                        model=(LLM_MODEL or "").strip(),
+                    )),
+                    self.loop,
+                )
+            except Exception as error:
+                print(f"⚠️  Failed to pre-warm LLM connection: {error}")
+
         if translation_target_lang is not None:
             self.set_translation_target_lang(translation_target_lang)
         osc_manager.clear_history()
@@ -506,9 +540,8 @@ class GeminiSession:
                 self._ipc_pending_final = ""
 
     def get_audio_source(self) -> str:
-        """返回当前配置的音频源"""
-        with self.audio_lock:
-            return self.audio_source
+        """返回当前配置的音频源。单次属性读取在 GIL 下本身是原子的，无需加锁。"""
+        return self.audio_source
 
     def get_microphone_device_id(self) -> str:
         with self.audio_lock:
@@ -627,8 +660,8 @@ class GeminiSession:
         previous = self._vrchat_self_muted
         self._vrchat_self_muted = muted
 
-        with self.audio_lock:
-            streamer = self.audio_streamer
+        # 只读一次指针快照，无需加锁（换流器的复合操作仍由 audio_lock 保护）
+        streamer = self.audio_streamer
 
         if streamer and hasattr(streamer, "set_vrchat_mic_muted"):
             try:
@@ -696,18 +729,16 @@ class GeminiSession:
         speaker = str(token.get("speaker", "?"))
         translation_status = token.get("translation_status", "original")
 
-        if speaker not in self._sentence_buffers:
-            self._sentence_buffers[speaker] = {
-                "original_tokens": [],
-                "translation_tokens": [],
-            }
-
-        buffer = self._sentence_buffers[speaker]
+        buffer = self._sentence_buffers.get(speaker)
+        if buffer is None:
+            buffer = self._sentence_buffers[speaker] = _SpeakerSentenceBuffer()
 
         if translation_status == "translation":
-            buffer["translation_tokens"].append(token)
+            buffer.translation_tokens.append(token)
+            buffer.translation_texts.append(str(token.get("text", "")))
         else:
-            buffer["original_tokens"].append(token)
+            buffer.original_tokens.append(token)
+            buffer.original_texts.append(str(token.get("text", "")))
 
     def _join_token_texts(self, tokens: list[dict]) -> str:
         return "".join(
@@ -843,11 +874,10 @@ class GeminiSession:
         )
 
         for speaker in active_speakers:
-            buffer = self._sentence_buffers.get(speaker) or {}
-            final_translation_tokens = buffer.get("translation_tokens") or []
-            final_original_tokens = buffer.get("original_tokens") or []
+            buffer = self._sentence_buffers.get(speaker)
+            final_original_tokens = buffer.original_tokens if buffer else []
 
-            final_translation_text = self._join_token_texts(final_translation_tokens)
+            final_translation_text = "".join(buffer.translation_texts) if buffer else ""
             non_final_translation_text = "".join(non_final_translation_by_speaker.get(speaker, []))
             translation_text = f"{final_translation_text}{non_final_translation_text}".strip()
 
@@ -903,11 +933,13 @@ class GeminiSession:
 
     def _sentence_context_text_for_token(self, token: dict) -> str:
         speaker = str(token.get("speaker", "?"))
-        buffer = self._sentence_buffers.get(speaker) or {}
+        buffer = self._sentence_buffers.get(speaker)
         token_text = str(token.get("text") or "")
+        if buffer is None:
+            return token_text
         if token.get("translation_status") == "translation":
-            return f"{self._join_token_texts(buffer.get('translation_tokens') or [])}{token_text}"
-        return f"{self._join_token_texts(buffer.get('original_tokens') or [])}{token_text}"
+            return f"{''.join(buffer.translation_texts)}{token_text}"
+        return f"{''.join(buffer.original_texts)}{token_text}"
 
     def _clear_pending_boundaries_for_speaker(self, speaker: str) -> None:
         self._pending_boundaries.clear_speaker(speaker)
@@ -935,7 +967,7 @@ class GeminiSession:
         buffer = self._sentence_buffers.get(speaker)
         if not buffer:
             return False
-        text = self._join_token_texts(buffer.get("original_tokens") or [])
+        text = "".join(buffer.original_texts)
         return bool(text) and self._is_sentence_ending_punctuation(text)
 
     def _trigger_sentence_finalization(self, speaker: str) -> bool:
@@ -944,8 +976,8 @@ class GeminiSession:
         if not buffer:
             return False
 
-        original_tokens = buffer.get("original_tokens") or []
-        translation_tokens = buffer.get("translation_tokens") or []
+        original_tokens = buffer.original_tokens
+        translation_tokens = buffer.translation_tokens
 
         if not original_tokens:
             return False
@@ -1009,7 +1041,16 @@ class GeminiSession:
         refined_translation = display_translation
         no_change = True
 
-        if is_llm_refine_available() and mode != "off" and translation:
+        # Pass-through draft: the built-in translation echoes a source that is
+        # already in the target language, so copying it verbatim is correct and
+        # a refine can only answer no-change — skip that round-trip.
+        refine_is_passthrough = (
+            mode == "refine"
+            and translation == source
+            and self._can_use_source_as_translation(original_tokens)
+        )
+
+        if is_llm_refine_available() and mode != "off" and translation and not refine_is_passthrough:
             try:
                 if mode == "refine":
                     result = await self._perform_refine(source, translation, context_items)
@@ -1045,10 +1086,11 @@ class GeminiSession:
             no_change=no_change,
         )
 
-        self._refine_context_history.append({"source": source, "translation": refined_translation})
+        # maxlen 在正常运行中不变；仅当测试替换了 bounds 时才重建
         max_history = max(1, int(self._context_bounds()[1]))
-        if len(self._refine_context_history) > max_history:
-            self._refine_context_history = self._refine_context_history[-max_history:]
+        if self._refine_context_history.maxlen != max_history:
+            self._refine_context_history = deque(self._refine_context_history, maxlen=max_history)
+        self._refine_context_history.append({"source": source, "translation": refined_translation})
 
     def _get_dynamic_context_items(self) -> list[dict]:
         """Return context items with cyclical window: min -> ... -> max -> min."""
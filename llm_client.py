@@ -11,18 +11,20 @@ The backend uses this for translation refinement.
 from __future__ import annotations
 
 import asyncio
+import functools
 import json
 import re
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-import aiohttp
+if TYPE_CHECKING:
+    import aiohttp
 
 from llm_log import log_event
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LlmConfig:
     base_url: str
     api_key: str
@@ -35,51 +37,115 @@ class LlmError(RuntimeError):
     pass
 
 
-_http_session: Optional[aiohttp.ClientSession] = None
-_http_session_lock: Optional[asyncio.Lock] = None
+_http_sessions: Dict[int, "aiohttp.ClientSession"] = {}
+_http_session_locks: Dict[int, "asyncio.Lock"] = {}
+_ssl_context = None
 
 
 async def _get_http_session() -> aiohttp.ClientSession:
-    """Return a shared aiohttp session to enable HTTP keep-alive.
+    """Return the shared aiohttp session for the running event loop.
 
-    Creating a new ClientSession per request defeats connection reuse.
-    We keep a process-level session and close it during app cleanup.
+    Creating a new ClientSession per request defeats connection reuse — but a
+    single module-global is wrong too: a session is bound to the loop it was
+    created on, and once a different loop calls in (pytest-asyncio, an app
+    restart with a fresh loop) it silently stops pooling or errors outright.
+    Sessions are therefore keyed by loop and closed together during cleanup.
     """
 
-    global _http_session, _http_session_lock
+    import aiohttp
 
-    if _http_session_lock is None:
-        _http_session_lock = asyncio.Lock()
+    key = id(asyncio.get_running_loop())
 
-    async with _http_session_lock:
-        if _http_session is not None and not _http_session.closed:
-            return _http_session
+    # Double-checked fast path: once the loop's session exists, concurrent
+    # refines shouldn't serialize on (or even touch) the lock.
+    session = _http_sessions.get(key)
+    if session is not None and not session.closed:
+        return session
+
+    # dict.setdefault is atomic under the GIL; the lock itself must be
+    # per-loop because an asyncio.Lock binds to the loop that first awaits it.
+    lock = _http_session_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        session = _http_sessions.get(key)
+        if session is not None and not session.closed:
+            return session
+
+        # Share one SSLContext across connections: building a fresh context
+        # (CA load + cipher setup) per TLS connect dominates reconnect cost.
+        global _ssl_context
+        if _ssl_context is None:
+            import ssl
+
+            _ssl_context = ssl.create_default_context()
 
         connector = aiohttp.TCPConnector(
             limit=50,
             limit_per_host=20,
             ttl_dns_cache=300,
-            keepalive_timeout=30,
+            # OpenAI-compatible gateways typically keep idle connections ~75s;
+            # matching that avoids needless reconnect+handshake churn.
+            keepalive_timeout=75,
+            ssl=_ssl_context,
+            enable_cleanup_closed=True,
         )
 
         # Do not set a global timeout here; pass per-request timeouts instead.
-        _http_session = aiohttp.ClientSession(connector=connector)
-        return _http_session
+        session = aiohttp.ClientSession(connector=connector)
+        _http_sessions[key] = session
+        return session
 
 
 async def close_llm_http_session() -> None:
-    """Close the shared aiohttp session used for LLM calls."""
+    """Close every shared aiohttp session used for LLM calls."""
 
-    global _http_session
-    session = _http_session
-    _http_session = None
-    if session is None:
-        return
-    if session.closed:
+    sessions = list(_http_sessions.values())
+    _http_sessions.clear()
+    _http_session_locks.clear()
+    closable = [session for session in sessions if not session.closed]
+    if closable:
+        await asyncio.gather(*(session.close() for session in closable), return_exceptions=True)
+
+
+async def prewarm(config: LlmConfig, n: int = 2) -> None:
+    """Open warm keep-alive connections to the LLM endpoint ahead of first use.
+
+    Without this the first chat_completion pays DNS + TCP + TLS on the request
+    critical path, delaying the first refined subtitle by one handshake. A
+    cheap HEAD per desired connection parks warmed sockets in the pooled
+    session's idle list; any failure is ignored — the first real call will
+    surface genuine problems.
+    """
+
+    import aiohttp
+
+    try:
+        url = _build_chat_completions_url(config.base_url)
+    except LlmError:
         return
-    await session.close()
+
+    session = await _get_http_session()
+    timeout = aiohttp.ClientTimeout(total=10)
+
+    async def _open_one() -> None:
+        try:
+            async with session.head(url, allow_redirects=False, timeout=timeout):
+                pass
+        except Exception:
+            pass
+
+    await asyncio.gather(*(_open_one() for _ in range(max(1, int(n)))))
+
+
+@functools.lru_cache(maxsize=16)
+def _auth_headers(api_key: str) -> Dict[str, str]:
+    """Default headers for a key. Cached; callers must not mutate the result."""
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
 
 
+@functools.lru_cache(maxsize=8)
 def _build_chat_completions_url(base_url: str) -> str:
     value = (base_url or "").strip().rstrip("/")
     if not value:
@@ -99,6 +165,8 @@ async def chat_completion(
 ) -> str:
     """Call an OpenAI-compatible Chat Completions API and return the assistant content."""
 
+    import aiohttp
+
     if not config.api_key:
         raise LlmError("LLM api key is not configured")
     if not config.model:
@@ -118,23 +186,23 @@ async def chat_completion(
     if config.extra_json:
         payload.update(config.extra_json)
 
-    headers = {
-        "Authorization": f"Bearer {config.api_key}",
-        "Content-Type": "application/json",
-    }
-
     # Merge extra HTTP headers (may override default headers)
     if config.extra_headers:
-        headers.update(config.extra_headers)
+        headers = {**_auth_headers(config.api_key), **config.extra_headers}
+    else:
+        headers = _auth_headers(config.api_key)
 
     timeout = aiohttp.ClientTimeout(total=timeout_seconds)
     session = await _get_http_session()
     _t0 = time.perf_counter()
     try:
         async with session.post(url, json=payload, headers=headers, timeout=timeout) as resp:
-            text = await resp.text()
+            # Read raw bytes; json.loads decodes UTF-8 in C, so the happy path
+            # walks the payload once instead of text() + loads().
+            raw = await resp.read()
             _elapsed_ms = int((time.perf_counter() - _t0) * 1000)
             if resp.status >= 400:
+                text = raw[:4000].decode("utf-8", "replace")
                 log_event(
                     "llm_http",
                     model=config.model,
@@ -142,11 +210,12 @@ async def chat_completion(
                     latency_ms=_elapsed_ms,
                     error=text[:500],
                 )
-                raise LlmError(f"LLM request failed: HTTP {resp.status}: {text[:4000]}")
+                raise LlmError(f"LLM request failed: HTTP {resp.status}: {text}")
 
             try:
-                data = json.loads(text)
+                data = json.loads(raw)
             except Exception as exc:
+                text = raw[:4000].decode("utf-8", "replace")
                 log_event(
                     "llm_http",
                     model=config.model,
@@ -154,7 +223,7 @@ async def chat_completion(
                     latency_ms=_elapsed_ms,
                     error=f"non-JSON response: {text[:500]}",
                 )
-                raise LlmError(f"LLM returned non-JSON response: {text[:4000]}") from exc
+                raise LlmError(f"LLM returned non-JSON response: {text}") from exc
     except LlmError:
         raise
     except Exception as exc:
@@ -186,11 +255,21 @@ async def chat_completion(
         f"total: ↑{_llm_total_uncached}+{_llm_total_cached}c  ↓{_llm_total_completion}"
     )
 
-    _content = ""
+    # Index directly - the except below already covers KeyError/IndexError/
+    # TypeError, and the chained .get() version allocated default objects and
+    # walked the structure twice (once for logging, once for the return).
     try:
-        _content = str(data.get("choices", [])[0].get("message", {}).get("content", "") or "")
-    except Exception:
-        pass
+        _content = str(data["choices"][0]["message"]["content"] or "")
+    except Exception as exc:
+        log_event(
+            "llm_http",
+            model=config.model,
+            status=200,
+            latency_ms=_elapsed_ms,
+            error="unexpected response format",
+        )
+        raise LlmError(f"LLM response format unexpected: {data}") from exc
+
     log_event(
         "llm_http",
         model=config.model,
@@ -202,19 +281,12 @@ async def chat_completion(
         cached=cached_tokens,
         completion=completion_tokens,
     )
-
-    try:
-        return (
-            data.get("choices", [])[0]
-            .get("message", {})
-            .get("content", "")
-        )
-    except Exception as exc:
-        raise LlmError(f"LLM response format unexpected: {data}") from exc
+    return _content
 
 
 _ANSWER_RE = re.compile(r"<answer>(.*?)</answer>", re.DOTALL | re.IGNORECASE)
 _THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL | re.IGNORECASE)
+_TRAILING_ANSWER_CLOSE_RE = re.compile(r"</answer>\s*$", re.IGNORECASE)
 
 # Cumulative token counters across all LLM calls in this process
 _llm_total_uncached: int = 0
@@ -233,6 +305,20 @@ def extract_answer_tag(text: str) -> str:
     if not raw:
         return ""
 
+    # Nearly all responses carry no <think> block: either plain text or a
+    # single <answer> pair. Both are handled with C-level substring scans,
+    # keeping the regex engine off the per-response path entirely.
+    lowered = raw.lower()
+    if "<think>" not in lowered:
+        start = lowered.rfind("<answer>")
+        if start < 0:
+            return raw
+        start += len("<answer>")
+        end = lowered.find("</answer>", start)
+        if end < 0:
+            end = len(raw)
+        return raw[start:end].strip()
+
     # Strip any chain-of-thought tags to avoid leaking them.
     raw = _THINK_RE.sub("", raw).strip()
     if not raw:
@@ -249,7 +335,7 @@ def extract_answer_tag(text: str) -> str:
         if tag in lowered:
             idx = lowered.rfind(tag)
             candidate = raw[idx + len(tag):].strip()
-            candidate = re.sub(r"</answer>\s*$", "", candidate, flags=re.IGNORECASE).strip()
+            candidate = _TRAILING_ANSWER_CLOSE_RE.sub("", candidate).strip()
             return candidate
         return raw
 
@@ -7,8 +7,11 @@ own ``chat`` coroutine (its ``_llm_chat``, which routes to the relay or a local
 key) and the per-utterance target language.
 """
 import asyncio
+import functools
+import hashlib
 import re
 import time
+from collections import OrderedDict
 from typing import Awaitable, Callable, Optional
 
 import config
@@ -45,6 +48,51 @@ ERROR_CATEGORIES = frozenset(
 
 _ANSWER_TAG_RE = re.compile(r"<answer>(.*?)</answer>", re.IGNORECASE | re.DOTALL)
 _ERROR_TAG_RE = re.compile(r"<error>(.*?)</error>", re.IGNORECASE | re.DOTALL)
+_FENCE_OPEN_RE = re.compile(r"^```[^\n]*\n")
+_FENCE_CLOSE_RE = re.compile(r"\n```$")
+
+# Memo of completed LLM outcomes keyed by a hash of the exact request. Stuttery
+# ASR finalizations and rebroadcasts re-submit byte-identical prompts within
+# seconds; answering those from memory skips the whole round-trip and its
+# tokens. Only successful outcomes are stored — errors must stay retryable.
+_RESPONSE_CACHE_MAX = 256
+_response_cache: "OrderedDict[str, dict]" = OrderedDict()
+
+
+def _response_cache_key(kind: str, messages: list[dict[str, str]]) -> str:
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(f"{kind}|{config.LLM_TEMPERATURE}|{config.LLM_REFINE_MAX_TOKENS}".encode())
+    for message in messages:
+        hasher.update(b"\x00")
+        hasher.update(message["content"].encode("utf-8", "surrogatepass"))
+    return hasher.hexdigest()
+
+
+def _response_cache_get(key: str) -> Optional[dict]:
+    result = _response_cache.get(key)
+    if result is not None:
+        _response_cache.move_to_end(key)
+    return result
+
+
+def _response_cache_put(key: str, result: dict) -> None:
+    _response_cache[key] = result
+    _response_cache.move_to_end(key)
+    if len(_response_cache) > _RESPONSE_CACHE_MAX:
+        _response_cache.popitem(last=False)
+
+
+def _attempt_timeout_seconds(attempt: int) -> float:
+    """Wall-clock budget for one chat attempt, escalating 5s → 10s → 20s.
+
+    The configured transport timeout is a worst-case ceiling; a healthy
+    provider answers these short prompts in well under 5 seconds, so a stalled
+    first attempt is far more likely a dead connection than a slow response.
+    Cutting it early and retrying beats pinning a sentence for the full
+    transport timeout. Capped at ``config.llm_timeout_seconds()`` so a
+    deliberately short configured timeout still wins.
+    """
+    return min(max(1.0, float(config.llm_timeout_seconds())), 5.0 * (2 ** attempt))
 
 
 def _clean_target_lang(target_lang) -> str:
@@ -81,14 +129,23 @@ def _normalize_context(context_items) -> list[dict]:
 def _render_context_block(normalized_context: list[dict], *, mention_translation: bool) -> str:
     if not normalized_context:
         return ""
+    pairs = tuple((item["source"], item["translation"]) for item in normalized_context)
+    return _render_context_pairs(pairs, mention_translation)
+
+
+# A refine and a translate of the same sentence (and consecutive sentences
+# sharing recent history) rebuild an identical block; memoize the rendered
+# string so the second build is a cache lookup.
+@functools.lru_cache(maxsize=64)
+def _render_context_pairs(pairs: tuple, mention_translation: bool) -> str:
     short_clause = "source/translation" if mention_translation else "source"
     lines = [
         "Context (for coherence only; do NOT quote it; do NOT merge or rewrite it into the current translation; "
         f"even if the {short_clause} is short, do NOT output the context; use it only to resolve pronouns, references, and coherence):",
     ]
-    for idx, item in enumerate(normalized_context, start=1):
-        lines.append(f"{idx}. Source: {item['source']}")
-        lines.append(f"   Translation: {item['translation']}")
+    for idx, (ctx_source, ctx_translation) in enumerate(pairs, start=1):
+        lines.append(f"{idx}. Source: {ctx_source}")
+        lines.append(f"   Translation: {ctx_translation}")
     return "\n".join(lines) + "\n\n"
 
 
@@ -100,8 +157,8 @@ def _suffix_block() -> str:
 def _strip_code_fence(text: str) -> str:
     value = text
     if value.startswith("```"):
-        value = re.sub(r"^```[^\n]*\n", "", value)
-        value = re.sub(r"\n```$", "", value.strip())
+        value = _FENCE_OPEN_RE.sub("", value)
+        value = _FENCE_CLOSE_RE.sub("", value.strip())
     return value.strip("`").strip()
 
 
@@ -141,93 +198,117 @@ def parse_refine_response(raw_content: str, draft: str, source: str = "") -> dic
     return {"has_answer": True, "no_change": False, "refined": answer, "category": category}
 
 
+# The instruction bodies are module constants so every request carries a
+# byte-identical prefix: OpenAI-compatible providers only reuse their prompt
+# cache when the leading messages match exactly, and rebuilding the ~1.5KB
+# rule text per call (or interleaving volatile context before it) defeats
+# that. Everything that varies per sentence lives in the user message.
+_REFINE_SYSTEM_PROMPT = (
+    "You are a precise translation error checker.\n\n"
+    "Role: Error checker for real-time subtitle translations. The draft you will receive was produced by a fast "
+    "streaming translator. Decide whether the draft contains a MEANING-LEVEL ERROR against the source "
+    "utterance. Fix only meaning-level errors; never restyle.\n\n"
+    "## Meaning-level errors (the ONLY reasons to change the draft)\n"
+    " - mistranslation: the draft says something different from the source (wrong meaning, reversed logic, "
+    "negation lost, tense that changes meaning)\n"
+    " - wrong-subject: the action is attributed to the wrong person (e.g. the source omits the subject and "
+    "the draft guessed the wrong \"I/you/he/she/they\")\n"
+    " - wrong-number-or-name: wrong number, date, quantity, or named entity\n"
+    " - question-form: a question rendered as a statement, or the reverse\n"
+    " - omission: meaning-bearing source words are missing from the draft and not covered by a context line\n"
+    " - hallucination: the draft contains meaning found in neither the source nor the context lines\n"
+    " - untranslated: source-language words left untranslated in the draft (names may stay in their usual "
+    "written form)\n"
+    " - garbled: the draft text is corrupted or unreadable\n\n"
+    "## Not errors — NEVER change these\n"
+    " - unidiomatic but understandable wording, word order, synonyms, punctuation, active/passive voice, "
+    "equivalent phrasings; a defensible word choice is not a mistranslation — flag mistranslation only when "
+    "the draft's meaning actually differs from the source's\n"
+    " - the source is a mid-sentence fragment and the draft translates it as a fragment; incompleteness "
+    "that mirrors the source is normal\n"
+    " - dangling sentence-final particles, fillers, stray tense markers, or word repetitions that "
+    "segmentation cut off (e.g. a lone \"た。\" or trailing \"from\") carry no translatable meaning — "
+    "leaving them out is not an omission, and restoring them is not a fix\n"
+    " - stutters, false starts, and self-corrections in the source (e.g. \"バ、バック、爆速で\" or "
+    "\"I- I mean\") that the draft smoothed into the intended word — smoothing is correct; do NOT count "
+    "the smoothed syllables as omission, do NOT translate a false start as if it were its own word "
+    "(バック here is a stumble toward 爆速, not \"bag\")\n"
+    " - the draft borrows a subject, name, or a few words from the context lines — the streaming translator "
+    "hears neighboring speech, so this is correct behavior, not hallucination; if unsure whether a word came "
+    "from neighboring speech, keep the draft\n"
+    " - names transliterated as the speaker actually said them; never replace a name with a different name "
+    "you infer from context\n"
+    " - source text that is already in the target language; the draft may keep or drop it — neither is an "
+    "omission or untranslated; if most of the source is already in the target language, output NO CHANGE\n\n"
+    "Streaming caution: sources are cut mid-sentence. Before calling omission or hallucination, check the "
+    "context lines — meaning that appears in a neighboring line is already covered there. If the source is "
+    "too fragmentary to judge, output NO CHANGE.\n\n"
+    "## Procedure\n"
+    "First output one short <check> line: `none`, or `category: evidence`. The evidence must quote the exact "
+    "words as they appear in the source and/or draft — if you cannot quote them, output NO CHANGE. "
+    "Then output the answer. A change without a category from the list above will be discarded.\n\n"
+    "## Output format (exactly one of)\n"
+    "1. No meaning-level error:\n"
+    "<check>none</check>\n"
+    f"<answer>{NO_CHANGE_MARKER}</answer>\n"
+    "2. Meaning-level error found — minimal fix, keep all other draft wording:\n"
+    "<check>category: evidence</check>\n"
+    f"<answer>{_REFINE_PLACEHOLDER}</answer>\n"
+    "<error>mistranslation|wrong-subject|wrong-number-or-name|question-form|omission|hallucination|"
+    "untranslated|garbled</error>\n\n"
+    "## Examples (target language Chinese here; apply the same rules for the actual target language)\n"
+    "Source: 行くって言ってたよ。 (context: talking about a friend)\n"
+    "Draft: 我说过我会去。\n"
+    "<check>wrong-subject: 言ってた reports the friend, draft says 我</check>\n"
+    "<answer>他说过他会去。</answer>\n"
+    "<error>wrong-subject</error>\n\n"
+    "Source: and then we could probably\n"
+    "Draft: 然后我们大概可以\n"
+    "<check>none</check>\n"
+    f"<answer>{NO_CHANGE_MARKER}</answer>\n\n"
+    "Source: った。それでね、\n"
+    "Draft: 然后呢，\n"
+    "<check>none — the stray った。 was cut off by segmentation, not an omission</check>\n"
+    f"<answer>{NO_CHANGE_MARKER}</answer>\n\n"
+    "Source: ちょっとバ、バック、爆速で作りましょう。\n"
+    "Draft: 稍微用超快的速度来做吧。\n"
+    "<check>none — バ、バック are false starts of 爆速; the draft correctly smoothed them</check>\n"
+    f"<answer>{NO_CHANGE_MARKER}</answer>\n\n"
+    "Source: said she would be late (context mentions 小美 speaking)\n"
+    "Draft: 小美说她会迟到\n"
+    "<check>none</check>\n"
+    f"<answer>{NO_CHANGE_MARKER}</answer>\n\n"
+    "Source: I haven't seen him since Monday.\n"
+    "Draft: 我周一见过他。\n"
+    "<check>mistranslation: haven't seen since Monday became 见过</check>\n"
+    "<answer>我从周一起就没见过他。</answer>\n"
+    "<error>mistranslation</error>\n\n"
+    "Source: つまりこういう感じで、\n"
+    "Draft: 所以就买了这个，\n"
+    "<check>hallucination: 买了这个 is in neither source nor context</check>\n"
+    "<answer>就是这种感觉，</answer>\n"
+    "<error>hallucination</error>\n\n"
+    "Do NOT explain outside the tags."
+)
+
+_TRANSLATE_SYSTEM_PROMPT = (
+    "You are a professional real-time translator. Translate the source text into the target language.\n"
+    "\n"
+    "Rules:\n"
+    "1. Output ONLY the translation; no explanations or extra text.\n"
+    "2. Preserve the original meaning, named entities, numbers, and tone.\n"
+    "3. If the source is a question, keep it a question in the translation (preserve question intent and punctuation such as '?' where appropriate).\n"
+    "4. Do NOT add or omit information.\n"
+    "5. If the source omits the subject/actor, supply it only when it can be confidently inferred from context; "
+    "otherwise leave it unstated rather than guessing, where the target language allows subject omission.\n\n"
+    "Output ONLY the translation wrapped exactly as:\n"
+    f"<answer>{_TRANSLATE_PLACEHOLDER}</answer>"
+)
+
+
 def _build_refine_prompt(source: str, translation: str, target_lang_value: str, context_block: str) -> str:
     return (
         f"Target language: {config.describe_target_language(target_lang_value)}\n\n"
-        "Role: Error checker for real-time subtitle translations. The draft below was produced by a fast "
-        "streaming translator. Decide whether the draft contains a MEANING-LEVEL ERROR against the source "
-        "utterance. Fix only meaning-level errors; never restyle.\n\n"
-        "## Meaning-level errors (the ONLY reasons to change the draft)\n"
-        " - mistranslation: the draft says something different from the source (wrong meaning, reversed logic, "
-        "negation lost, tense that changes meaning)\n"
-        " - wrong-subject: the action is attributed to the wrong person (e.g. the source omits the subject and "
-        "the draft guessed the wrong \"I/you/he/she/they\")\n"
-        " - wrong-number-or-name: wrong number, date, quantity, or named entity\n"
-        " - question-form: a question rendered as a statement, or the reverse\n"
-        " - omission: meaning-bearing source words are missing from the draft and not covered by a context line\n"
-        " - hallucination: the draft contains meaning found in neither the source nor the context lines\n"
-        " - untranslated: source-language words left untranslated in the draft (names may stay in their usual "
-        "written form)\n"
-        " - garbled: the draft text is corrupted or unreadable\n\n"
-        "## Not errors — NEVER change these\n"
-        " - unidiomatic but understandable wording, word order, synonyms, punctuation, active/passive voice, "
-        "equivalent phrasings; a defensible word choice is not a mistranslation — flag mistranslation only when "
-        "the draft's meaning actually differs from the source's\n"
-        " - the source is a mid-sentence fragment and the draft translates it as a fragment; incompleteness "
-        "that mirrors the source is normal\n"
-        " - dangling sentence-final particles, fillers, stray tense markers, or word repetitions that "
-        "segmentation cut off (e.g. a lone \"た。\" or trailing \"from\") carry no translatable meaning — "
-        "leaving them out is not an omission, and restoring them is not a fix\n"
-        " - stutters, false starts, and self-corrections in the source (e.g. \"バ、バック、爆速で\" or "
-        "\"I- I mean\") that the draft smoothed into the intended word — smoothing is correct; do NOT count "
-        "the smoothed syllables as omission, do NOT translate a false start as if it were its own word "
-        "(バック here is a stumble toward 爆速, not \"bag\")\n"
-        " - the draft borrows a subject, name, or a few words from the context lines — the streaming translator "
-        "hears neighboring speech, so this is correct behavior, not hallucination; if unsure whether a word came "
-        "from neighboring speech, keep the draft\n"
-        " - names transliterated as the speaker actually said them; never replace a name with a different name "
-        "you infer from context\n"
-        " - source text that is already in the target language; the draft may keep or drop it — neither is an "
-        "omission or untranslated; if most of the source is already in the target language, output NO CHANGE\n\n"
-        "Streaming caution: sources are cut mid-sentence. Before calling omission or hallucination, check the "
-        "context lines — meaning that appears in a neighboring line is already covered there. If the source is "
-        "too fragmentary to judge, output NO CHANGE.\n\n"
-        "## Procedure\n"
-        "First output one short <check> line: `none`, or `category: evidence`. The evidence must quote the exact "
-        "words as they appear in the source and/or draft above — if you cannot quote them, output NO CHANGE. "
-        "Then output the answer. A change without a category from the list above will be discarded.\n\n"
-        "## Output format (exactly one of)\n"
-        "1. No meaning-level error:\n"
-        "<check>none</check>\n"
-        f"<answer>{NO_CHANGE_MARKER}</answer>\n"
-        "2. Meaning-level error found — minimal fix, keep all other draft wording:\n"
-        "<check>category: evidence</check>\n"
-        f"<answer>{_REFINE_PLACEHOLDER}</answer>\n"
-        "<error>mistranslation|wrong-subject|wrong-number-or-name|question-form|omission|hallucination|"
-        "untranslated|garbled</error>\n\n"
-        "## Examples (target language Chinese here; apply the same rules for the actual target language)\n"
-        "Source: 行くって言ってたよ。 (context: talking about a friend)\n"
-        "Draft: 我说过我会去。\n"
-        "<check>wrong-subject: 言ってた reports the friend, draft says 我</check>\n"
-        "<answer>他说过他会去。</answer>\n"
-        "<error>wrong-subject</error>\n\n"
-        "Source: and then we could probably\n"
-        "Draft: 然后我们大概可以\n"
-        "<check>none</check>\n"
-        f"<answer>{NO_CHANGE_MARKER}</answer>\n\n"
-        "Source: った。それでね、\n"
-        "Draft: 然后呢，\n"
-        "<check>none — the stray った。 was cut off by segmentation, not an omission</check>\n"
-        f"<answer>{NO_CHANGE_MARKER}</answer>\n\n"
-        "Source: ちょっとバ、バック、爆速で作りましょう。\n"
-        "Draft: 稍微用超快的速度来做吧。\n"
-        "<check>none — バ、バック are false starts of 爆速; the draft correctly smoothed them</check>\n"
-        f"<answer>{NO_CHANGE_MARKER}</answer>\n\n"
-        "Source: said she would be late (context mentions 小美 speaking)\n"
-        "Draft: 小美说她会迟到\n"
-        "<check>none</check>\n"
-        f"<answer>{NO_CHANGE_MARKER}</answer>\n\n"
-        "Source: I haven't seen him since Monday.\n"
-        "Draft: 我周一见过他。\n"
-        "<check>mistranslation: haven't seen since Monday became 见过</check>\n"
-        "<answer>我从周一起就没见过他。</answer>\n"
-        "<error>mistranslation</error>\n\n"
-        "Source: つまりこういう感じで、\n"
-        "Draft: 所以就买了这个，\n"
-        "<check>hallucination: 买了这个 is in neither source nor context</check>\n"
-        "<answer>就是这种感觉，</answer>\n"
-        "<error>hallucination</error>\n\n"
-        "Do NOT explain outside the tags.\n\n"
         f"{context_block}"
         "Source:\n```\n"
         f"{source}\n"
@@ -242,17 +323,6 @@ def _build_refine_prompt(source: str, translation: str, target_lang_value: str,
 def _build_translate_prompt(source: str, target_lang_value: str, context_block: str) -> str:
     return (
         f"Target language: {config.describe_target_language(target_lang_value)}\n\n"
-        "You are a professional real-time translator. Translate the source text into the target language.\n"
-        "\n"
-        "Rules:\n"
-        "1. Output ONLY the translation; no explanations or extra text.\n"
-        "2. Preserve the original meaning, named entities, numbers, and tone.\n"
-        "3. If the source is a question, keep it a question in the translation (preserve question intent and punctuation such as '?' where appropriate).\n"
-        "4. Do NOT add or omit information.\n"
-        "5. If the source omits the subject/actor, supply it only when it can be confidently inferred from context; "
-        "otherwise leave it unstated rather than guessing, where the target language allows subject omission.\n\n"
-        "Output ONLY the translation wrapped exactly as:\n"
-        f"<answer>{_TRANSLATE_PLACEHOLDER}</answer>\n\n"
         f"{context_block}"
         "Source:\n```\n"
         f"{source}\n"
@@ -278,7 +348,7 @@ def build_refine_messages(
         _normalize_context(context_items), mention_translation=True
     )
     return [
-        {"role": "system", "content": "You are a precise translation error checker."},
+        {"role": "system", "content": _REFINE_SYSTEM_PROMPT},
         {
             "role": "user",
             "content": _build_refine_prompt(
@@ -303,7 +373,7 @@ def build_translate_messages(
         _normalize_context(context_items), mention_translation=False
     )
     return [
-        {"role": "system", "content": "You are a precise real-time translator."},
+        {"role": "system", "content": _TRANSLATE_SYSTEM_PROMPT},
         {
             "role": "user",
             "content": _build_translate_prompt(
@@ -337,6 +407,12 @@ async def perform_refine(
         target_lang=target_lang,
     )
 
+    cache_key = _response_cache_key("refine", messages)
+    cached = _response_cache_get(cache_key)
+    if cached is not None:
+        log_event("refine_cache_hit", source=source, draft=translation)
+        return dict(cached)
+
     t0 = time.perf_counter()
 
     def _log_decision(decision: str, *, attempt: int, raw: str = "", parsed: Optional[dict] = None, error: str = ""):
@@ -357,12 +433,21 @@ async def perform_refine(
 
     for attempt in range(MAX_REFINE_ATTEMPTS):
         try:
-            content = await chat(
-                messages[0]["content"],
-                messages[1]["content"],
-                temperature=float(config.LLM_TEMPERATURE),
-                max_tokens=int(config.LLM_REFINE_MAX_TOKENS),
+            content = await asyncio.wait_for(
+                chat(
+                    messages[0]["content"],
+                    messages[1]["content"],
+                    temperature=float(config.LLM_TEMPERATURE),
+                    max_tokens=int(config.LLM_REFINE_MAX_TOKENS),
+                ),
+                timeout=_attempt_timeout_seconds(attempt),
             )
+        except asyncio.TimeoutError:
+            if attempt < MAX_REFINE_ATTEMPTS - 1:
+                log_event("refine_retry_timeout", attempt=attempt + 1, source=source)
+                continue
+            _log_decision("error", attempt=attempt, error="timeout")
+            return {"status": "error", "message": "LLM request timed out", "no_change": True}
         except (asyncio.CancelledError, Exception) as exc:
             if isinstance(exc, HostedLlmDisabled):
                 _log_decision("error", attempt=attempt, error="llm_disabled")
@@ -386,19 +471,25 @@ async def perform_refine(
                 )
                 continue
             _log_decision("no_answer", attempt=attempt, raw=raw_content, parsed=parsed)
-            return {"status": "ok", "no_change": True}
+            result = {"status": "ok", "no_change": True}
+            _response_cache_put(cache_key, result)
+            return result
 
         if parsed["no_change"]:
             _log_decision("no_change", attempt=attempt, raw=raw_content, parsed=parsed)
-            return {"status": "ok", "no_change": True}
+            result = {"status": "ok", "no_change": True}
+            _response_cache_put(cache_key, result)
+            return result
 
         _log_decision("applied", attempt=attempt, raw=raw_content, parsed=parsed)
-        return {
+        result = {
             "status": "ok",
             "no_change": False,
             "refined_translation": parsed["refined"],
             "error_category": parsed["category"],
         }
+        _response_cache_put(cache_key, result)
+        return result
 
     return {"status": "ok", "no_change": True}
 
@@ -422,6 +513,12 @@ async def perform_translate(
         target_lang=target_lang,
     )
 
+    cache_key = _response_cache_key("translate", messages)
+    cached = _response_cache_get(cache_key)
+    if cached is not None:
+        log_event("translate_cache_hit", source=source)
+        return dict(cached)
+
     t0 = time.perf_counter()
 
     def _log_translate(decision: str, *, attempt: int, raw: str = "", translated: str = "", error: str = ""):
@@ -440,12 +537,21 @@ async def perform_translate(
 
     for attempt in range(MAX_TRANSLATE_ATTEMPTS):
         try:
-            content = await chat(
-                messages[0]["content"],
-                messages[1]["content"],
-                temperature=float(config.LLM_TEMPERATURE),
-                max_tokens=int(config.LLM_REFINE_MAX_TOKENS),
+            content = await asyncio.wait_for(
+                chat(
+                    messages[0]["content"],
+                    messages[1]["content"],
+                    temperature=float(config.LLM_TEMPERATURE),
+                    max_tokens=int(config.LLM_REFINE_MAX_TOKENS),
+                ),
+                timeout=_attempt_timeout_seconds(attempt),
             )
+        except asyncio.TimeoutError:
+            if attempt < MAX_TRANSLATE_ATTEMPTS - 1:
+                log_event("translate_retry_timeout", attempt=attempt + 1, source=source)
+                continue
+            _log_translate("error", attempt=attempt, error="timeout")
+            return {"status": "error", "message": "LLM request timed out"}
         except (asyncio.CancelledError, Exception) as exc:
             if isinstance(exc, HostedLlmDisabled):
                 _log_translate("error", attempt=attempt, error="llm_disabled")
@@ -474,6 +580,8 @@ async def perform_translate(
             return {"status": "error", "message": "placeholder translation"}
 
         _log_translate("ok", attempt=attempt, raw=raw_content, translated=translated)
-        return {"status": "ok", "translation": translated}
+        result = {"status": "ok", "translation": translated}
+        _response_cache_put(cache_key, result)
+        return result
 
     return {"status": "error", "message": "translation failed"}
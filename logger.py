@@ -5,9 +5,23 @@
 （取值 1/true/yes/y/on 之一时启用）。
 """
 import os
+import queue
 import threading
+import time
 from datetime import datetime
 
+# [HH:MM:SS] 时间戳按秒缓存：同一秒内的多次写入复用同一格式化结果
+_last_hms: list = [0, ""]
+
+
+def _hms_now() -> str:
+    """返回当前 HH:MM:SS 字符串（秒级缓存，避免每条日志都走 strftime）"""
+    second = int(time.time())
+    if second != _last_hms[0]:
+        _last_hms[0] = second
+        _last_hms[1] = time.strftime('%H:%M:%S', time.localtime(second))
+    return _last_hms[1]
+
 
 def _env_log_enabled() -> bool:
     """读取环境变量，判断是否启用日志写入（默认关闭）"""
@@ -25,6 +39,10 @@ class TranscriptLogger:
         self.enabled = _env_log_enabled() if enabled is None else enabled
         self.log_file = None
         self.log_lock = threading.Lock()
+        # 格式化好的日志行先进队列，由后台写入线程批量落盘，
+        # 避免在转写事件循环线程里做磁盘 I/O
+        self._write_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer_thread: threading.Thread | None = None
 
     def init_log_file(self):
         """初始化日志文件"""
@@ -41,79 +59,117 @@ class TranscriptLogger:
         log_filename = f"transcript_{timestamp}.txt"
         log_path = os.path.join(logs_dir, log_filename)
         
-        # 打开日志文件
-        self.log_file = open(log_path, 'w', encoding='utf-8')
+        # 打开日志文件（64 KiB 缓冲：小段追加先进用户态缓冲，减少写盘系统调用）
+        self.log_file = open(log_path, 'w', encoding='utf-8', buffering=64 * 1024)
         
         # 写入文件头
         self.log_file.write(f"=== Real-time Subtitle Log ===\n")
         self.log_file.write(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
         self.log_file.write(f"=" * 50 + "\n\n")
         self.log_file.flush()
-        
+
+        # 启动后台写入线程（close_log_file 通过 None 哨兵停止它）
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop, daemon=True, name="transcript-writer"
+        )
+        self._writer_thread.start()
+
         print(f"📝 Log file created: {log_path}")
         return log_path
-    
+
+    def _writer_loop(self):
+        """后台写入线程：攒批写盘，空闲约 100ms 或攒满 64 KiB 才 flush 一次"""
+        stop = False
+        while not stop:
+            item = self._write_queue.get()
+            if item is None:
+                break
+            batch = [item]
+            total = len(item)
+            while total < 64 * 1024:
+                try:
+                    nxt = self._write_queue.get(timeout=0.1)
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+                total += len(nxt)
+
+            with self.log_lock:
+                if self.log_file:
+                    try:
+                        # 整批拼成一个字符串一次写入，避免每行一次 write 调用；
+                        # flush 交给 64 KiB 文件缓冲和 close_log_file，进一步摊薄
+                        # 系统调用（代价是崩溃时最多丢一个缓冲区的尾部日志）
+                        self.log_file.write(batch[0] if len(batch) == 1 else ''.join(batch))
+                    except Exception as e:
+                        print(f"Error writing to log: {e}")
+
     def write_to_log(self, tokens: list):
-        """将final tokens写入日志文件"""
+        """将final tokens格式化后交给后台线程写入日志文件"""
         if not self.log_file:
             return
-        
-        with self.log_lock:
-            try:
-                # 获取当前时间戳
-                timestamp = datetime.now().strftime('%H:%M:%S')
-                
-                # 按说话人和语言组织tokens
-                current_speaker = None
-                current_lang = None
-                current_translation_status = None
-                current_line = []
-                current_line_tokens = []  # 保存完整的token对象以便检查translation_status
-                
-                for token in tokens:
-                    # 跳过分隔符
-                    if token.get('is_separator'):
-                        continue
-                    
-                    speaker = token.get('speaker')
-                    language = token.get('language')
-                    text = token.get('text', '')
-                    translation_status = token.get('translation_status', 'none')
-                    
-                    # 如果说话人或语言改变，先写入当前行
-                    if (speaker != current_speaker or language != current_lang) and current_line:
-                        line_text = ''.join(current_line)
-                        lang_tag = f"[{current_lang.upper()}]" if current_lang else ""
-                        speaker_tag = f"[SPEAKER {current_speaker}]" if current_speaker else ""
-                        status_tag = "[TRANS]" if any(t.get('translation_status') == 'translation' for t in current_line_tokens) else ""
-                        
-                        self.log_file.write(f"[{timestamp}] {speaker_tag}{lang_tag}{status_tag} {line_text}\n")
-                        current_line = []
-                        current_line_tokens = []
-                    
-                    current_speaker = speaker
-                    current_lang = language
-                    current_line.append(text)
-                    current_line_tokens.append(token)
-                
-                # 写入最后一行
-                if current_line:
+
+        try:
+            # 获取当前时间戳（秒级缓存）
+            timestamp = _hms_now()
+
+            # 按说话人和语言组织tokens
+            current_speaker = None
+            current_lang = None
+            current_line = []
+            current_has_trans = False  # 当前行是否含翻译token（增量维护，免去二次扫描）
+
+            for token in tokens:
+                # 跳过分隔符
+                if token.get('is_separator'):
+                    continue
+
+                speaker = token.get('speaker')
+                language = token.get('language')
+                text = token.get('text', '')
+
+                # 如果说话人或语言改变，先写入当前行
+                if (speaker != current_speaker or language != current_lang) and current_line:
                     line_text = ''.join(current_line)
                     lang_tag = f"[{current_lang.upper()}]" if current_lang else ""
                     speaker_tag = f"[SPEAKER {current_speaker}]" if current_speaker else ""
-                    
-                    # 检查是否包含翻译
-                    status_tag = "[TRANS]" if any(t.get('translation_status') == 'translation' for t in current_line_tokens) else ""
-                    
-                    self.log_file.write(f"[{timestamp}] {speaker_tag}{lang_tag}{status_tag} {line_text}\n")
-                
-                self.log_file.flush()
-                
-            except Exception as e:
-                print(f"Error writing to log: {e}")
+                    status_tag = "[TRANS]" if current_has_trans else ""
+
+                    self._write_queue.put(f"[{timestamp}] {speaker_tag}{lang_tag}{status_tag} {line_text}\n")
+                    current_line = []
+                    current_has_trans = False
+
+                current_speaker = speaker
+                current_lang = language
+                current_line.append(text)
+                if not current_has_trans and token.get('translation_status') == 'translation':
+                    current_has_trans = True
+
+            # 写入最后一行
+            if current_line:
+                line_text = ''.join(current_line)
+                lang_tag = f"[{current_lang.upper()}]" if current_lang else ""
+                speaker_tag = f"[SPEAKER {current_speaker}]" if current_speaker else ""
+
+                # 检查是否包含翻译
+                status_tag = "[TRANS]" if current_has_trans else ""
+
+                self._write_queue.put(f"[{timestamp}] {speaker_tag}{lang_tag}{status_tag} {line_text}\n")
+
+        except Exception as e:
+            print(f"Error writing to log: {e}")
     
     def close_log_file(self):
-        """关闭日志文件"""
+        """关闭日志文件（先等后台线程把排队的行写完）"""
+        writer = self._writer_thread
+        if writer is not None:
+            self._writer_thread = None
+            self._write_queue.put(None)
+            writer.join(timeout=5.0)
+
         with self.log_lock:
             if self.log_file:
                 self.log_file.write(f"\n{'=' * 50}\n")
@@ -4,9 +4,11 @@ OSC (Open Sound Control) 管理模块
 """
 import asyncio
 import logging
+import re
 import time
 import threading
 import os
+from collections import deque
 from typing import Optional
 from dataclasses import dataclass
 from vrchat_oscquery.common import dict_to_dispatcher, vrc_client
@@ -35,6 +37,12 @@ PRIORITY_LOW = 2   # ongoing 消息
 
 VRCHAT_MUTE_PATH = "/avatar/parameters/MuteSelf"
 
+# 句子结束标记（截断时按最早出现的一个切分）：
+# 常见标点 / CJK / 省略号及特殊符号 / 亚美尼亚、阿拉伯、希腊 / 印度系、埃塞、缅甸、藏文 /
+# 日文顿号、低位逗号、阿拉伯小数点。预编译成单个正则，一次 C 级扫描即可找到最早的标记，
+# 替代逐个标点 str.find 的 Python 循环。
+_SENTENCE_END_RE = re.compile(r"\.\.\.|[.?!,。？！，…‽։؟;،।॥።။།、‚٫]")
+
 @dataclass
 class QueuedMessage:
     """待发送的消息实体"""
@@ -57,6 +65,8 @@ class HistoryMessage:
     speaker: str = "?"
     own: bool = False
     msg_id: Optional[int] = None
+    # _format_line 渲染结果的缓存；text 或标签开关变化时置 None 重新渲染
+    line: Optional[str] = None
 
 
 class OSCManager:
@@ -75,6 +85,8 @@ class OSCManager:
             self._initialized = True
             self._client = None
             self._mute_callback = None  # 静音状态变化的回调函数
+            self._mute_is_coro = False  # 回调是否为协程（注册时确定）
+            self._mute_loop = None  # 协程回调的目标事件循环（注册时捕获）
             self._oscquery_enabled = str(os.environ.get("OSC_QUERY_ENABLED", "1")).strip().lower() in ("1", "true", "yes", "on")
             self._oscquery_app_name = str(os.environ.get("OSCQUERY_APP_NAME", "DeafaultAppName")).strip() or "DeafaultAppName"
             
@@ -84,14 +96,26 @@ class OSCManager:
             self._oscquery_httpd = None
             self._vrchat_linked_logged = False
             
-            # 发送节流配置（仅保留一个待发消息）
+            # 发送节流配置（仅保留一个待发消息），由常驻 flusher 线程消费：
+            # ongoing 字幕每几百毫秒更新一次，若每条都起一个 threading.Timer，
+            # 线程创建/取消开销远大于发送本身。
             self._cooldown_seconds = 1.5  # 发送冷却时间（秒）
             self._last_send_time = 0.0  # 上次发送时间
             self._pending_message: Optional[QueuedMessage] = None
-            self._pending_timer: Optional[threading.Timer] = None
+            self._last_sent_text: str = ""
+            self._last_sent_ongoing: Optional[bool] = None
+            self._last_typing_sent: Optional[bool] = None
+            self._last_typing_sent_at: float = 0.0
+            # 历史记录与待发槽位分锁：槽位锁只包住指针交换和冷却判断这几微秒，
+            # 发送节流不再被（可能较慢的）历史拼接路径卡住。
             self._state_lock = threading.Lock()
+            self._pending_lock = threading.Lock()
+            self._flush_wakeup = threading.Event()
+            threading.Thread(target=self._flush_loop, daemon=True, name="osc-flush").start()
             self._truncate_enabled = True
-            self._message_history: list[HistoryMessage] = []
+            # 有界 deque：最多 9 行（与组合上限一致），满了自动挤掉最旧的，
+            # 左端淘汰为 O(1)（list.pop(0) 是 O(N)）
+            self._message_history: deque[HistoryMessage] = deque(maxlen=9)
             self._next_msg_id = 1
             self._history_ttl_seconds = 10.0
             self._header_line = TRANSLATION_HEADER
@@ -123,12 +147,24 @@ class OSCManager:
                      当收到 MuteSelf=True 时调用 callback(True)
                      当收到 MuteSelf=False 时调用 callback(False)
         """
+        # 注册时就确定回调类型与目标事件循环，MuteSelf 每次触发时不再做
+        # iscoroutinefunction 探测和 get_running_loop 的异常往返
+        self._mute_is_coro = asyncio.iscoroutinefunction(callback)
+        if self._mute_is_coro:
+            try:
+                self._mute_loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._mute_loop = None
+        else:
+            self._mute_loop = None
         self._mute_callback = callback
         self._emit("[OSC] Mute callback registered")
-    
+
     def clear_mute_callback(self):
         """清除静音状态回调函数"""
         self._mute_callback = None
+        self._mute_is_coro = False
+        self._mute_loop = None
         self._emit("[OSC] Mute callback cleared")
     
     def get_udp_client(self):
@@ -144,11 +180,12 @@ class OSCManager:
             return
 
         try:
-            if asyncio.iscoroutinefunction(self._mute_callback):
-                try:
-                    running_loop = asyncio.get_running_loop()
-                    running_loop.create_task(self._mute_callback(mute_value))
-                except RuntimeError:
+            if getattr(self, "_mute_is_coro", False):
+                loop = self._mute_loop
+                if loop is not None and not loop.is_closed():
+                    # OSC 回调跑在监听线程上，协程回调投递回注册时的事件循环
+                    asyncio.run_coroutine_threadsafe(self._mute_callback(mute_value), loop)
+                else:
                     asyncio.run(self._mute_callback(mute_value))
             else:
                 self._mute_callback(mute_value)
@@ -204,10 +241,7 @@ class OSCManager:
     async def stop_server(self):
         """Stop OSCQuery service."""
         # 取消待处理消息
-        with self._state_lock:
-            if self._pending_timer is not None:
-                self._pending_timer.cancel()
-                self._pending_timer = None
+        with self._pending_lock:
             self._pending_message = None
 
         with self._oscquery_lock:
@@ -246,34 +280,18 @@ class OSCManager:
 
         if self._contains_only_wrapped_rtl_lines(text):
             return self._truncate_wrapped_rtl_lines(text, max_length)
-        
-        # 句子结束标记
-        SENTENCE_ENDERS = [
-            '.', '?', '!', ',',           # Common
-            '。', '？', '！', '，',        # CJK
-            '…', '...', '‽',             # Stylistic & Special (includes 3-dot ellipsis)
-            '։', '؟', ';', '،',           # Armenian, Arabic, Greek (as question mark), Arabic comma
-            '।', '॥', '።', '။', '།',    # Indic, Ethiopic, Myanmar, Tibetan
-            '、', '‚', '٫'               # Japanese enumeration comma, low comma, Arabic decimal separator
-        ]
-        
+
         # 当文本超长时，删除最前面的句子而不是截断末尾
         while len(text) > max_length:
-            # 尝试找到第一个句子的结束位置
-            first_sentence_end = -1
-            for ender in SENTENCE_ENDERS:
-                idx = text.find(ender)
-                if idx != -1 and (first_sentence_end == -1 or idx < first_sentence_end):
-                    first_sentence_end = idx
-            
-            if first_sentence_end != -1:
+            match = _SENTENCE_END_RE.search(text)
+            if match is not None:
                 # 删除第一个句子（包括标点符号后的空格）
-                text = text[first_sentence_end + 1:].lstrip()
+                text = text[match.end():].lstrip()
             else:
                 # 如果没有找到标点符号，删除前面的字符直到长度合适
                 text = text[len(text) - max_length:]
                 break
-        
+
         return text
 
     @staticmethod
@@ -326,11 +344,20 @@ class OSCManager:
     def _prune_history_locked(self, now: float):
         """移除超过 TTL 的历史消息（需要在锁内调用）"""
         ttl = getattr(self, "_history_ttl_seconds", 10.0)
-        self._message_history = [msg for msg in self._message_history if now - msg.timestamp <= ttl]
+        history = self._message_history
+        while history and now - history[0].timestamp > ttl:
+            history.popleft()
 
     def set_speaker_labels_enabled(self, enabled: bool) -> None:
         """启用/禁用 OSC 输出中的说话人标签（Soniox 启用，Gemini 禁用）。"""
-        self._show_speaker_labels = bool(enabled)
+        enabled = bool(enabled)
+        if enabled == self._show_speaker_labels:
+            return
+        self._show_speaker_labels = enabled
+        # 标签开关影响渲染结果，丢弃历史消息上缓存的行
+        with self._state_lock:
+            for msg in self._message_history:
+                msg.line = None
 
     def _format_line(self, msg: HistoryMessage) -> str:
         """根据消息来源格式化单行文本。
@@ -346,6 +373,14 @@ class OSCManager:
             return f"S{speaker}：{text}"
         return text
 
+    def _line_for(self, msg: HistoryMessage) -> str:
+        """取消息的渲染行，结果缓存在消息对象上（每条消息只格式化一次）。"""
+        line = getattr(msg, "line", None)
+        if line is None:
+            line = self._format_line(msg)
+            msg.line = line
+        return line
+
     def _line_decoration_len(self, msg: HistoryMessage) -> int:
         """计算 _format_line 在原始文本外额外占用的字符数（用于截断预算）。"""
         if getattr(msg, "own", False):
@@ -355,34 +390,42 @@ class OSCManager:
             return len(f"S{speaker}：")
         return 0
 
-    def _build_combined_history_from_messages(self, history: list[HistoryMessage]) -> str:
+    def _build_combined_history_from_messages(self, history: deque[HistoryMessage] | list[HistoryMessage]) -> str:
         """基于给定消息列表组合文本（会就地调整传入列表）"""
         header = getattr(self, "_header_line", "") or ""
         header_enabled = bool(header)
         max_lines = 9
 
         # 构造行：own 用 >...< 标记，Soniox 说话人用 S{speaker}：前缀，其余无前缀
-        lines = []
-        if header_enabled:
-            lines.append(header)
+        msg_lines = [self._line_for(msg) for msg in history]
+
+        # 行数上限（头部算一行）与字符预算（MAX_LENGTH，含换行）都从最新一条
+        # 向前累计，单次线性扫描求出可保留的最旧下标，替代旧的反复 pop +
+        # "\n".join 收缩循环（消息条数多时为 O(N²)）。
+        max_msgs = max_lines - 1 if header_enabled else max_lines
+        budget = MAX_LENGTH - (len(header) + 1) if header_enabled else MAX_LENGTH
+
+        keep = len(msg_lines)
+        total = 0
+        count = 0
+        for i in range(len(msg_lines) - 1, -1, -1):
+            cost = len(msg_lines[i]) + (1 if count else 0)
+            if count + 1 > max_msgs or total + cost > budget:
+                break
+            total += cost
+            count += 1
+            keep = i
 
-        for msg in history:
-            lines.append(self._format_line(msg))
+        # 无头部时至少保留最新一条（随后必要时截断它）；有头部时与旧逻辑一致，
+        # 预算不足可以只剩头部。
+        if count == 0 and msg_lines and not header_enabled:
+            keep = len(msg_lines) - 1
 
-        # 限制行数（保留最新），头部算一行
-        while len(lines) > max_lines:
-            # 如果有头部，先尝试移除最早的消息行（不能移除头部）
-            if header_enabled and len(lines) == 1:
-                break
-            if header_enabled and len(lines) > 1:
-                # 删除 header 之后的第一条消息
-                lines.pop(1)
-                if history:
-                    history.pop(0)
-            else:
-                lines.pop(0)
-                if history:
-                    history.pop(0)
+        for _ in range(keep):
+            del history[0]
+
+        lines = [header] if header_enabled else []
+        lines.extend(msg_lines[keep:])
 
         def assemble(line_list):
             return "\n".join(line_list)
@@ -391,16 +434,6 @@ class OSCManager:
         if not combined:
             return ""
 
-        # 超长时优先删除旧的整条消息（不删除头部）
-        while len(combined) > MAX_LENGTH and len(lines) > 1:
-            # 删除 header 后的第一条消息，如果没有 header 就删第一条
-            drop_index = 1 if header_enabled and len(lines) > 1 else 0
-            if drop_index < len(lines):
-                lines.pop(drop_index)
-            if history:
-                history.pop(0)
-            combined = assemble(lines)
-
         if len(combined) > MAX_LENGTH and len(lines) >= 1 and history:
             # 仅剩头部 + 最新一条或只有一条消息仍然超长，截断最新消息
             latest_idx = len(lines) - 1
@@ -423,7 +456,7 @@ class OSCManager:
                     own=getattr(msg, "own", False),
                     msg_id=getattr(msg, "msg_id", None),
                 )
-                lines[latest_idx] = self._format_line(history[-1])
+                lines[latest_idx] = self._line_for(history[-1])
                 combined = assemble(lines)
 
         return combined
@@ -471,6 +504,7 @@ class OSCManager:
             if target is None:
                 return False
             target.text = safe_text
+            target.line = None  # 文本变了，丢弃缓存的渲染行
             combined = self._build_combined_history_locked()
 
         if combined:
@@ -545,47 +579,32 @@ class OSCManager:
         if combined:
             self.send_text_sync(combined, ongoing)
     
-    def _schedule_pending_send_locked(self):
-        """在锁内调用，安排发送待处理消息"""
-        if self._pending_message is None:
-            self._pending_timer = None
-            return
-
-        if self._pending_timer is not None:
-            self._pending_timer.cancel()
-
-        wait = self._cooldown_seconds - (time.time() - self._last_send_time)
-        if wait <= 0:
-            wait = 0.01  # 避免忙等待，稍作延迟
-
-        timer = threading.Timer(wait, self._flush_pending_message)
-        timer.daemon = True
-        self._pending_timer = timer
-        timer.start()
-
-    def _flush_pending_message(self):
-        """发送当前待处理的消息（如果冷却结束）"""
-        with self._state_lock:
-            message = self._pending_message
-            if not message:
-                self._pending_timer = None
-                return
-
-            elapsed = time.time() - self._last_send_time
-            if elapsed < self._cooldown_seconds:
-                # 冷却尚未结束，重新安排
-                logger.debug("[OSC] Cooldown active; delaying pending message")
-                self._schedule_pending_send_locked()
-                return
-
-            # 可以发送
-            self._pending_message = None
-            self._pending_timer = None
-            self._last_send_time = time.time()
-            text = message.text
-            ongoing = message.ongoing
-
-        self._send_message_immediately(text, ongoing)
+    def _flush_loop(self):
+        """常驻 flusher 线程：冷却结束后发送待发消息（替代每条消息一个 Timer）"""
+        while True:
+            self._flush_wakeup.wait()
+            self._flush_wakeup.clear()
+            while True:
+                send_now = None
+                wait = 0.0
+                with self._pending_lock:
+                    message = self._pending_message
+                    if message is None:
+                        break
+                    now = time.time()
+                    wait = self._cooldown_seconds - (now - self._last_send_time)
+                    if wait <= 0:
+                        self._pending_message = None
+                        self._last_send_time = now
+                        send_now = message
+
+                if send_now is not None:
+                    self._send_message_immediately(send_now.text, send_now.ongoing)
+                else:
+                    # 冷却未结束：睡到冷却点。期间到达的新消息只会替换槽位，
+                    # 不需要提前唤醒；被 set 唤醒时清掉标记继续检查。
+                    if self._flush_wakeup.wait(wait):
+                        self._flush_wakeup.clear()
     
     def _send_message_immediately(self, text: str, ongoing: bool):
         """
@@ -597,12 +616,26 @@ class OSCManager:
         """
         try:
             client = self.get_udp_client()
-            client.send_message("/chatbox/typing", ongoing)
+            self._send_typing_if_needed(client, ongoing)
             client.send_message("/chatbox/input", [text, True, not ongoing])
+            self._last_sent_text = text
+            self._last_sent_ongoing = ongoing
             logger.info(f"[OSC] Sent chatbox message: '{text}' (ongoing={ongoing})")
         except Exception as e:
             logger.error(f"[OSC] Failed to send OSC message: {e}")
-    
+
+    def _send_typing_if_needed(self, client, typing: bool):
+        """发送 /chatbox/typing，值未变且仍新鲜时跳过（省一个冗余 UDP 包）。
+
+        VRChat 的打字指示会自行超时，所以同值也每隔几秒刷新一次。
+        """
+        now = time.time()
+        if typing == self._last_typing_sent and now - self._last_typing_sent_at < 3.0:
+            return
+        client.send_message("/chatbox/typing", typing)
+        self._last_typing_sent = typing
+        self._last_typing_sent_at = now
+
     async def set_typing(self, typing: bool):
         """兼容旧调用方式的异步接口"""
         if hasattr(asyncio, "to_thread"):
@@ -620,7 +653,7 @@ class OSCManager:
         """
         try:
             client = self.get_udp_client()
-            client.send_message("/chatbox/typing", typing)
+            self._send_typing_if_needed(client, typing)
             logger.debug(f"[OSC] Set typing state: {typing}")
         except Exception as e:
             logger.error(f"[OSC] Failed to set typing state: {e}")
@@ -640,18 +673,37 @@ class OSCManager:
         # 确定优先级
         priority = PRIORITY_LOW if ongoing else PRIORITY_HIGH
 
+        # 整个调用共用一个时间戳：少一次 time.time()，消息时间戳与冷却判断
+        # 也不会出现微小漂移
+        now = time.time()
         message = QueuedMessage(
             text=text,
             ongoing=ongoing,
             priority=priority,
-            timestamp=time.time(),
+            timestamp=now,
         )
 
         send_now = None
 
-        with self._state_lock:
-            now = time.time()
+        with self._pending_lock:
             elapsed = now - self._last_send_time
+
+            # 识别器修订 ongoing 文本时常会重放完全相同的内容：与待发槽位
+            # 或刚发出的消息一致时直接跳过（后者限制在短时间窗内，避免吞掉
+            # 聊天框淡出后的有意重发）。
+            pending = self._pending_message
+            if pending is not None:
+                if pending.text == text and pending.ongoing == ongoing and pending.priority == priority:
+                    logger.debug("[OSC] Skipped duplicate of pending message")
+                    return
+            elif (
+                text == self._last_sent_text
+                and ongoing == self._last_sent_ongoing
+                and elapsed <= self._history_ttl_seconds
+            ):
+                logger.debug("[OSC] Skipped duplicate of last sent message")
+                return
+
             can_send_now = elapsed >= self._cooldown_seconds and self._pending_message is None
 
             if can_send_now:
@@ -671,10 +723,11 @@ class OSCManager:
                     logger.debug("[OSC] Added pending message (priority=%s)", priority)
 
                 self._pending_message = message
-                self._schedule_pending_send_locked()
 
         if send_now is not None:
             self._send_message_immediately(send_now.text, send_now.ongoing)
+        else:
+            self._flush_wakeup.set()
 
 
 # 创建全局单例实例
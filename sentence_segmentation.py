@@ -5,7 +5,7 @@ from collections.abc import Callable
 # "…" stays in this set so punctuation-run scans treat it as punctuation
 # (e.g. "。…" is one trailing-off run, not a boundary), but
 # is_sentence_ender_at never lets it END a sentence.
-SENTENCE_END_CHARS = {"。", "！", "？", ".", "!", "?", "︒", "︕", "︖", "…"}
+SENTENCE_END_CHARS = frozenset({"。", "！", "？", ".", "!", "?", "︒", "︕", "︖", "…"})
 CLOSING_QUOTE_CHARS = "\"'”’»›」』》"
 # Unambiguous open/close quote-bracket pairs. A sentence ender INSIDE an
 # unclosed pair does not end the sentence: the quoted passage is one unit
@@ -15,20 +15,20 @@ CLOSING_QUOTE_CHARS = "\"'”’»›」』》"
 # ten-sentence pairing shift run). ASCII "/' are ambiguous (no open/close
 # distinction) and ASCII parens appear in emoticons; both are excluded.
 QUOTE_PAIRS = {"「": "」", "『": "』", "“": "”", "（": "）", "【": "】", "《": "》"}
-SENTENCE_END_ABBREVIATION_EXCEPTIONS = {
+SENTENCE_END_ABBREVIATION_EXCEPTIONS = frozenset({
     "a.m.",
     "p.m.",
     "e.g.",
     "i.e.",
     "u.s.",
     "u.k.",
-}
-SENTENCE_END_ABBREVIATION_PREFIXES = {
+})
+SENTENCE_END_ABBREVIATION_PREFIXES = frozenset(
     abbreviation[: index + 1]
     for abbreviation in SENTENCE_END_ABBREVIATION_EXCEPTIONS
     for index, ch in enumerate(abbreviation[:-1])
     if ch == "."
-}
+)
 
 
 def is_sentence_ender_at(value: str, index: int) -> bool:
@@ -141,6 +141,10 @@ def is_sentence_ending_punctuation(text: str) -> bool:
         value = value[:-1].rstrip()
     if not value:
         return False
+    # Most tokens end in an ordinary character; one set lookup rules them out
+    # without running the dozen endswith abbreviation scans below.
+    if value[-1] not in SENTENCE_END_CHARS:
+        return False
     if text_ends_with_abbreviation_exception(value) or text_ends_with_abbreviation_prefix(value):
         return False
     return has_sentence_ending_punctuation(value)
@@ -515,8 +515,12 @@ class ProviderManager:
         session_mod.ipc_server = self.ipc_server
         self.osc_manager.set_speaker_labels_enabled(bool(self.config.ENABLE_SPEAKER_DIARIZATION))
 
-        # Resolve key and start (or mark setup_required).
-        key, error = self._resolve_current_key()
+        # Resolve key and start (or mark setup_required). Resolution may fetch
+        # a temporary key over HTTP (requests, up to 10s) — run it in the
+        # executor so the event loop keeps serving requests meanwhile.
+        key, error = await asyncio.get_running_loop().run_in_executor(
+            None, self._resolve_current_key
+        )
         started = False
         if key:
             try:
@@ -617,14 +621,32 @@ class OverlayManager:
 
 def run_server(app, sock):
     """在单独的线程中运行Web服务器"""
+    # 装了 uvloop 就用（Linux/macOS），socket 读写和定时器调度明显更快；
+    # Windows 或未安装时静默退回默认 asyncio 循环
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
+    # 直接用 AppRunner + SockSite 而不是 run_app：少一层封装和启动打印，
+    # 并把关停等待压到 2 秒（默认 60 秒会拖慢整个进程退出）。
+    # 在非主线程运行时必须禁用信号处理（Linux 下否则会触发 set_wakeup_fd 报错）
+    runner = web.AppRunner(app, handle_signals=False)
     try:
-        # 在非主线程运行时必须禁用信号处理（Linux 下否则会触发 set_wakeup_fd 报错）
-        web.run_app(app, print=None, sock=sock, handle_signals=False)
+        loop.run_until_complete(runner.setup())
+        site = web.SockSite(runner, sock, shutdown_timeout=2.0)
+        loop.run_until_complete(site.start())
+        loop.run_forever()
     except Exception as e:
         print(f"Error in server thread: {e}")
     finally:
+        try:
+            loop.run_until_complete(runner.cleanup())
+        except Exception:
+            pass
+        loop.close()
         sock.close()
 
 
@@ -660,6 +682,7 @@ def main():
     import config
     from config import (
         SERVER_HOST, SERVER_PORT, AUTO_OPEN_WEBVIEW,
+        SERVER_SOCKET_BUFFER_BYTES, LISTEN_BACKLOG,
     )
     from logger import TranscriptLogger
     from web_server import WebServer
@@ -677,10 +700,15 @@ def main():
 
     # broadcast 回调引用 web_server（在 ProviderManager 重建 session 后仍然有效，
     # 因为广播是 WebServer 的方法而非 session 的）。
+    async def _noop_broadcast():
+        # 空协程即刻完成；asyncio.sleep(0) 还要走一趟调度器让出循环，
+        # 而这个回调可能以识别事件的频率被调用
+        return None
+
     def broadcast_callback(data):
         if web_server:
             return web_server.broadcast_to_clients(data)
-        return asyncio.sleep(0)  # 返回一个空的协程
+        return _noop_broadcast()  # 返回一个空的协程
 
     ipc_server = IPCServer()
 
@@ -776,8 +804,16 @@ def main():
             except Exception:
                 pass
 
+    shutdown_started = threading.Event()
+
     def graceful_shutdown() -> None:
         """优雅关闭所有连接和进程，防止遗留孤儿进程或断开异常。"""
+        # 重复触发（例如关闭窗口的同时按了 Ctrl+C）直接忽略，
+        # 避免第二次进入时在清理到一半的对象上再报一轮错误
+        if shutdown_started.is_set():
+            return
+        shutdown_started.set()
+
         # 1. 停止当前 API 会话（优雅关闭 API 端的 WebSocket 连接并停止音频流）
         session = getattr(web_server, "session", None)
         if session is not None:
@@ -804,6 +840,12 @@ def main():
                         await ipc_server.stop()
                     except Exception:
                         pass
+                # 关闭共享的 LLM HTTP 连接池
+                try:
+                    from llm_client import close_llm_http_session
+                    await close_llm_http_session()
+                except Exception:
+                    pass
 
             future = asyncio.run_coroutine_threadsafe(async_cleanup(), loop)
             try:
@@ -848,7 +890,9 @@ def main():
     app = web_server.create_app()
 
     async def start_background_tasks(app_instance):
-        loop = asyncio.get_event_loop()
+        # on_startup 回调一定运行在 aiohttp 的循环里，get_running_loop 拿到的
+        # 就是它 —— 不会像 get_event_loop 那样在策略层兜一圈或建新循环
+        loop = asyncio.get_running_loop()
         provider_manager.loop = loop
         # 启动 seeding：用环境变量里的 key 起 session；没有就保持等待（前端弹设置面板）。
         await provider_manager.seed_start()
@@ -872,8 +916,22 @@ def main():
         for port in candidates:
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             try:
+                # 重启时端口可能还处于 TIME_WAIT，没有这个标志会 bind 失败并
+                # 触发换端口回退，WebView 地址跟着变。Windows 上的 SO_REUSEADDR
+                # 语义不同（允许抢占活跃端口），所以只在非 Windows 平台设置。
+                if os.name != "nt":
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                # 可选放大收发缓冲区（Linux 上 accept 出的连接会继承），
+                # 弱网慢客户端不至于因为默认缓冲太小过早触发背压
+                if SERVER_SOCKET_BUFFER_BYTES > 0:
+                    try:
+                        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SERVER_SOCKET_BUFFER_BYTES)
+                        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SERVER_SOCKET_BUFFER_BYTES)
+                    except OSError:
+                        pass
                 sock.bind((host, port))
-                sock.listen(128)
+                # 默认用系统允许的最大 backlog，多个页面同时刷新时不丢 SYN
+                sock.listen(LISTEN_BACKLOG if LISTEN_BACKLOG > 0 else socket.SOMAXCONN)
                 sock.setblocking(False)
                 actual_port = sock.getsockname()[1]
                 return sock, actual_port
@@ -955,9 +1013,11 @@ def main():
         if not debug and os.name == 'nt':
             try:
                 import ctypes
-                wh = ctypes.windll.kernel32.GetConsoleWindow()
+                kernel32 = ctypes.windll.kernel32
+                user32 = ctypes.windll.user32
+                wh = kernel32.GetConsoleWindow()
                 if wh:
-                    ctypes.windll.user32.ShowWindow(wh, 0)
+                    user32.ShowWindow(wh, 0)
             except Exception:
                 pass
 
@@ -10,7 +10,8 @@ import concurrent.futures
 import logging
 import unicodedata
 import uuid
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
 from typing import Any, Optional, Tuple
 
 from websockets import ConnectionClosed, ConnectionClosedOK
@@ -60,6 +61,7 @@ from audio_capture import AudioStreamer
 from osc_manager import osc_manager
 from osc_draft import OscDraftPublisher
 from llm_client import LlmConfig, chat_completion, extract_answer_tag, LlmError
+from llm_client import prewarm as llm_prewarm
 from hosted_llm import HostedLlmTransport, HostedLlmError, HostedLlmDisabled
 import sentence_segmentation
 import llm_refine
@@ -122,6 +124,23 @@ SPEC_TRANSLATE_MAX_INFLIGHT = 3
 INTERRUPT_REPAIR_HISTORY_MAX = 8
 
 
+@dataclass(slots=True)
+class _SpeakerSentenceBuffer:
+    """单个说话人正在累积的句子 token。
+
+    固定形状的结构体；属性访问比 dict["key"] 少一次哈希查找，
+    而这两个字段在每个 token 上都要摸一遍。
+    """
+    original_tokens: list[dict] = field(default_factory=list)
+    translation_tokens: list[dict] = field(default_factory=list)
+    # 与 token 列表平行的纯文本列表，追加时填充；拼整句文本时一次 join
+    # 就够，不用每次把所有 token dict 再走一遍
+    original_texts: list[str] = field(default_factory=list)
+    translation_texts: list[str] = field(default_factory=list)
+    # 由短打断修复创建的合并句会记下被撤回句子的 id
+    interrupt_repair_of: Optional[str] = None
+
+
 @dataclass
 class _FinalizedSentenceSnapshot:
     speaker: str
@@ -240,7 +259,7 @@ class SonioxSession:
         self._vrchat_self_muted = False
         self.osc_translation_enabled = False
         self._segment_mode = DEFAULT_SEGMENT_MODE if DEFAULT_SEGMENT_MODE in ("translation", "endpoint", "punctuation") else "punctuation"
-        self._sentence_buffers: dict[str, dict] = {}
+        self._sentence_buffers: dict[str, _SpeakerSentenceBuffer] = {}
         # Speakers whose <end> fired before the sentence's translation was ready.
         # The line break is deferred until the translation arrives (or the next
         # sentence starts) so the late translation stays attached to this
@@ -255,7 +274,10 @@ class SonioxSession:
         # exclusively. See sentence_pairing.py for the routing/close rules.
         self._pairer = SentencePairer(self._alloc_sentence_id)
         self._osc_live_last_text_by_speaker: dict[str, str] = {}
-        self._refine_context_history: list[dict] = []
+        # 有界 deque：append 时自动淘汰最旧条目，省去每句一次的切片重建
+        self._refine_context_history: deque[dict] = deque(
+            maxlen=max(1, int(config.llm_context_bounds()[1]))
+        )
         self._llm_context_cycle_count = int(LLM_REFINE_CONTEXT_MIN_COUNT)
         default_mode = str(LLM_REFINE_DEFAULT_MODE or "").strip().lower()
         if default_mode not in LLM_REFINE_MODES:
@@ -358,6 +380,20 @@ class SonioxSession:
             except Exception as error:
                 print(f"⚠️  Failed to start OSC listener for MuteSelf: {error}")
 
+        # 提前与 LLM 端点建立 keep-alive 连接，避免首次润色请求承担完整握手延迟
+        if self.loop and not config.llm_is_hosted() and (LLM_BASE_URL or "").strip():
+            try:
+                asyncio.run_coroutine_threadsafe(
+                    llm_prewarm(LlmConfig(
+                        base_url=(LLM_BASE_URL or "").strip(),
+                        api_key=get_llm_api_key(),
+                        model=(LLM_MODEL or "").strip(),
+                    )),
+                    self.loop,
+                )
+            except Exception as error:
+                print(f"⚠️  Failed to pre-warm LLM connection: {error}")
+
         if translation_target_lang is not None:
             self.set_translation_target_lang(translation_target_lang)
         osc_manager.clear_history()
@@ -518,9 +554,8 @@ class SonioxSession:
                 self._ipc_pending_final = ""
 
     def get_audio_source(self) -> str:
-        """返回当前配置的音频源"""
-        with self.audio_lock:
-            return self.audio_source
+        """返回当前配置的音频源。单次属性读取在 GIL 下本身是原子的，无需加锁。"""
+        return self.audio_source
 
     def get_microphone_device_id(self) -> str:
         with self.audio_lock:
@@ -639,8 +674,8 @@ class SonioxSession:
         previous = self._vrchat_self_muted
         self._vrchat_self_muted = muted
 
-        with self.audio_lock:
-            streamer = self.audio_streamer
+        # 只读一次指针快照，无需加锁（换流器的复合操作仍由 audio_lock 保护）
+        streamer = self.audio_streamer
 
         if streamer and hasattr(streamer, "set_vrchat_mic_muted"):
             try:
@@ -729,18 +764,16 @@ class SonioxSession:
         else:
             self._pairer.route_source_token(token, speaker)
 
-        if speaker not in self._sentence_buffers:
-            self._sentence_buffers[speaker] = {
-                "original_tokens": [],
-                "translation_tokens": [],
-            }
-
-        buffer = self._sentence_buffers[speaker]
+        buffer = self._sentence_buffers.get(speaker)
+        if buffer is None:
+            buffer = self._sentence_buffers[speaker] = _SpeakerSentenceBuffer()
 
         if translation_status == "translation":
-            buffer["translation_tokens"].append(token)
+            buffer.translation_tokens.append(token)
+            buffer.translation_texts.append(str(token.get("text", "")))
         else:
-            buffer["original_tokens"].append(token)
+            buffer.original_tokens.append(token)
+            buffer.original_texts.append(str(token.get("text", "")))
 
     def _pairing_expects_translation(self, entry: PairedSentence) -> bool:
         """Whether a separate translation stream is coming for this sentence.
@@ -979,11 +1012,10 @@ class SonioxSession:
         )
 
         for speaker in active_speakers:
-            buffer = self._sentence_buffers.get(speaker) or {}
-            final_translation_tokens = buffer.get("translation_tokens") or []
-            final_original_tokens = buffer.get("original_tokens") or []
+            buffer = self._sentence_buffers.get(speaker)
+            final_original_tokens = buffer.original_tokens if buffer else []
 
-            final_translation_text = self._join_token_texts(final_translation_tokens)
+            final_translation_text = "".join(buffer.translation_texts) if buffer else ""
             non_final_translation_text = "".join(non_final_translation_by_speaker.get(speaker, []))
             translation_text = f"{final_translation_text}{non_final_translation_text}".strip()
 
@@ -1037,8 +1069,8 @@ class SonioxSession:
 
         now = time.monotonic()
         for speaker, tail in non_final_by_speaker.items():
-            buffer = self._sentence_buffers.get(speaker) or {}
-            tokens = list(buffer.get("original_tokens") or []) + tail
+            buffer = self._sentence_buffers.get(speaker)
+            tokens = list(buffer.original_tokens if buffer else []) + tail
             # Already in the target language: finalize won't translate either.
             if self._can_use_source_as_translation(tokens):
                 continue
@@ -1177,11 +1209,13 @@ class SonioxSession:
 
     def _sentence_context_text_for_token(self, token: dict) -> str:
         speaker = str(token.get("speaker", "?"))
-        buffer = self._sentence_buffers.get(speaker) or {}
+        buffer = self._sentence_buffers.get(speaker)
         token_text = str(token.get("text") or "")
+        if buffer is None:
+            return token_text
         if token.get("translation_status") == "translation":
-            return f"{self._join_token_texts(buffer.get('translation_tokens') or [])}{token_text}"
-        return f"{self._join_token_texts(buffer.get('original_tokens') or [])}{token_text}"
+            return f"{''.join(buffer.translation_texts)}{token_text}"
+        return f"{''.join(buffer.original_texts)}{token_text}"
 
     def _clear_pending_boundaries_for_speaker(self, speaker: str) -> None:
         self._pending_boundaries.clear_speaker(speaker)
@@ -1445,18 +1479,23 @@ class SonioxSession:
         previous, _interrupt = match
         previous.retracted = True
         self._retracted_sentence_ids.add(previous.sentence_id)
-        self._refine_context_history = [
-            item for item in self._refine_context_history
-            if item.get("sentence_id") != previous.sentence_id
-        ]
+        self._refine_context_history = deque(
+            (
+                item for item in self._refine_context_history
+                if item.get("sentence_id") != previous.sentence_id
+            ),
+            maxlen=self._refine_context_history.maxlen,
+        )
         merged_sentence_id = self._alloc_sentence_id()
         restored_original = self._clone_tokens_for_interrupt_merge(previous.original_tokens, merged_sentence_id)
         restored_translation = self._clone_tokens_for_interrupt_merge(previous.translation_tokens, merged_sentence_id)
-        self._sentence_buffers[str(current_speaker)] = {
-            "original_tokens": restored_original,
-            "translation_tokens": restored_translation,
-            "interrupt_repair_of": previous.sentence_id,
-        }
+        self._sentence_buffers[str(current_speaker)] = _SpeakerSentenceBuffer(
+            original_tokens=restored_original,
+            translation_tokens=restored_translation,
+            original_texts=[str(t.get("text", "")) for t in restored_original],
+            translation_texts=[str(t.get("text", "")) for t in restored_translation],
+            interrupt_repair_of=previous.sentence_id,
+        )
         # Reopen the merged sentence in the pairer so the continuation's
         # source tokens append to it and any translation still streaming for
         # the retracted fragment routes back into the merged sentence.
@@ -1525,8 +1564,8 @@ class SonioxSession:
         if not buffer:
             return False
 
-        original_tokens = buffer.get("original_tokens") or []
-        translation_tokens = buffer.get("translation_tokens") or []
+        original_tokens = buffer.original_tokens
+        translation_tokens = buffer.translation_tokens
 
         if not original_tokens:
             return False
@@ -1578,6 +1617,16 @@ class SonioxSession:
         # LLM call (saves credits, avoids echoing the same text as a translation).
         if mode == "translate" and fallback_to_source:
             llm_can_run = False
+        # Pass-through draft: the built-in translation echoes a source that is
+        # already in the target language, so copying it verbatim is correct and
+        # a refine can only answer no-change — skip that round-trip too.
+        if (
+            mode == "refine"
+            and llm_can_run
+            and translation == source
+            and self._can_use_source_as_translation(original_tokens)
+        ):
+            llm_can_run = False
         will_llm_translate = llm_can_run and mode == "translate"
 
         # In accurate mode there is no built-in translation to show, so only bail
@@ -1698,14 +1747,15 @@ class SonioxSession:
             no_change=no_change,
         )
 
+        # maxlen 在正常运行中不变；仅当测试替换了 bounds 时才重建
+        max_history = max(1, int(self._context_bounds()[1]))
+        if self._refine_context_history.maxlen != max_history:
+            self._refine_context_history = deque(self._refine_context_history, maxlen=max_history)
         self._refine_context_history.append({
             "sentence_id": sentence_id,
             "source": source,
             "translation": refined_translation,
         })
-        max_history = max(1, int(self._context_bounds()[1]))
-        if len(self._refine_context_history) > max_history:
-            self._refine_context_history = self._refine_context_history[-max_history:]
 
     def _get_dynamic_context_items(self) -> list[dict]:
         """Return context items with cyclical window: min -> ... -> max -> min."""
@@ -2478,8 +2528,8 @@ class SonioxSession:
                 if not buffer:
                     self._pending_endpoint_speakers.discard(pending_speaker)
                     continue
-                translation_tokens = buffer.get("translation_tokens") or []
-                original_tokens = buffer.get("original_tokens") or []
+                translation_tokens = buffer.translation_tokens
+                original_tokens = buffer.original_tokens
                 if not translation_tokens and not self._source_drives_segmentation(original_tokens):
                     continue
                 self._pending_endpoint_speakers.discard(pending_speaker)
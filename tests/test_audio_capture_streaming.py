@@ -0,0 +1,69 @@
+import numpy as np
+
+import audio_capture
+
+
+def test_pcm_converter_matches_clip_scale_cast():
+    data = np.array([-2.0, -1.0, -0.5, 0.0, 0.5, 1.0, 2.0], dtype=np.float32)
+    expected = (np.clip(data, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+    assert bytes(audio_capture._convert_float32_to_int16(data)) == expected
+
+
+def test_ring_buffer_wraps_and_preserves_order():
+    ring = audio_capture._AudioRingBuffer(8)
+    ring.write(np.arange(6, dtype=np.float32))
+    out = np.empty(4, dtype=np.float32)
+    assert ring.read(4, out) == 4
+    np.testing.assert_array_equal(out, [0, 1, 2, 3])
+
+    ring.write(np.arange(10, 16, dtype=np.float32))  # wraps the 8-frame buffer
+    assert len(ring) == 8
+    out = np.empty(8, dtype=np.float32)
+    assert ring.read(8, out) == 8
+    np.testing.assert_array_equal(out, [4, 5, 10, 11, 12, 13, 14, 15])
+
+
+def test_ring_buffer_drops_oldest_on_overflow():
+    ring = audio_capture._AudioRingBuffer(4)
+    ring.write(np.arange(3, dtype=np.float32))
+    ring.write(np.arange(10, 13, dtype=np.float32))
+    assert len(ring) == 4
+    out = np.empty(4, dtype=np.float32)
+    ring.read(4, out)
+    np.testing.assert_array_equal(out, [2, 10, 11, 12])
+
+
+def test_resample_to_chunk_matches_linear_interpolation():
+    from types import SimpleNamespace
+
+    streamer = audio_capture.AudioStreamer(SimpleNamespace(send=lambda payload: None))
+    source = np.sin(np.linspace(0.0, 6.0, num=960, dtype=np.float32))
+
+    resampled = streamer._resample_to_chunk(source, 3840)
+    expected = np.interp(
+        np.linspace(0.0, 1.0, num=3840),
+        np.linspace(0.0, 1.0, num=960),
+        source,
+    )
+
+    assert resampled.dtype == np.float32
+    assert resampled.shape == (3840,)
+    np.testing.assert_allclose(resampled, expected, atol=1e-5)
+
+
+def test_pcm_converter_reuses_buffers_across_calls():
+    converter = audio_capture._PcmInt16Converter()
+    first = bytes(converter.convert(np.full(64, 0.5, dtype=np.float32)))
+    second = bytes(converter.convert(np.full(64, -0.25, dtype=np.float32)))
+    assert np.frombuffer(first, dtype=np.int16)[0] == 16383
+    assert np.frombuffer(second, dtype=np.int16)[0] == -8191
+
+
+def test_pcm_converter_returns_owned_payloads():
+    # The router buffers payload objects as-is during stream rollover, so an
+    # earlier chunk must survive later convert calls unchanged.
+    converter = audio_capture._PcmInt16Converter()
+    first = converter.convert(np.full(64, 0.5, dtype=np.float32))
+    converter.convert(np.full(64, -0.25, dtype=np.float32))
+    assert isinstance(first, bytes)
+    assert np.frombuffer(first, dtype=np.int16)[0] == 16383
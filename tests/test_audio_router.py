@@ -104,6 +104,17 @@ def test_energy_silence_detector_waits_for_hold_duration():
     assert detector.is_ready() is True
 
 
+def test_energy_silence_detector_accepts_non_bytes_buffers():
+    from array import array
+
+    detector = EnergySilenceDetector(sample_rate=16000, silence_hold_seconds=0.4)
+    silence = array("h", [0] * 3840)  # int16-typed buffer, roughly 0.24s at 16 kHz
+
+    assert detector.update(memoryview(silence)) is True
+    assert detector.update(bytearray(7680)) is True
+    assert detector.is_ready() is True
+
+
 def test_ten_vad_silence_detector_waits_for_non_speech_hold(monkeypatch):
     class FakeTenVad:
         def __init__(self, hop_size, threshold):
@@ -90,6 +90,7 @@ async def test_frontend_frame_log_write_failure_does_not_block_broadcast(monkeyp
     logger = MagicMock()
     server = web_server_class(None, logger)
     client = MagicMock()
+    client.closed = False
     client.send_str = AsyncMock()
     server.websocket_clients.add(client)
 
@@ -77,6 +77,7 @@ def _install_gemini_session_import_mocks(monkeypatch):
     llm_client.chat_completion = MagicMock()
     llm_client.extract_answer_tag = lambda text: text
     llm_client.LlmError = RuntimeError
+    llm_client.prewarm = MagicMock()
     monkeypatch.setitem(sys.modules, "llm_client", llm_client)
 
 
@@ -1,6 +1,7 @@
 import json
 from unittest.mock import AsyncMock, MagicMock
 
+import aiohttp
 import pytest
 
 import llm_client
@@ -17,8 +18,9 @@ class FakeResponse:
     async def __aexit__(self, exc_type, exc, tb):
         return False
 
-    async def text(self):
-        return self._body
+    async def read(self):
+        body = self._body
+        return body if isinstance(body, bytes) else str(body).encode("utf-8")
 
 
 class FakeSession:
@@ -192,10 +194,10 @@ async def test_shared_http_session_is_reused_and_closed(monkeypatch):
         async def close(self):
             self.closed = True
 
-    monkeypatch.setattr(llm_client.aiohttp, "TCPConnector", lambda **kwargs: ("connector", kwargs))
-    monkeypatch.setattr(llm_client.aiohttp, "ClientSession", Session)
-    monkeypatch.setattr(llm_client, "_http_session", None)
-    monkeypatch.setattr(llm_client, "_http_session_lock", None)
+    monkeypatch.setattr(aiohttp, "TCPConnector", lambda **kwargs: ("connector", kwargs))
+    monkeypatch.setattr(aiohttp, "ClientSession", Session)
+    monkeypatch.setattr(llm_client, "_http_sessions", {})
+    monkeypatch.setattr(llm_client, "_http_session_locks", {})
 
     first = await llm_client._get_http_session()
     second = await llm_client._get_http_session()
@@ -204,5 +206,5 @@ async def test_shared_http_session_is_reused_and_closed(monkeypatch):
 
     await llm_client.close_llm_http_session()
     assert first.closed is True
-    assert llm_client._http_session is None
+    assert llm_client._http_sessions == {}
     await llm_client.close_llm_http_session()
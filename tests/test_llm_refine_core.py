@@ -7,10 +7,12 @@ import llm_refine
 
 @pytest.fixture(autouse=True)
 def stable_prompt_config(monkeypatch):
+    llm_refine._response_cache.clear()
     monkeypatch.setattr(llm_refine.config, "LLM_REFINE_CONTEXT_MAX_COUNT", 2, raising=False)
     monkeypatch.setattr(llm_refine.config, "LLM_PROMPT_SUFFIX", "", raising=False)
     monkeypatch.setattr(llm_refine.config, "LLM_TEMPERATURE", 0.2, raising=False)
     monkeypatch.setattr(llm_refine.config, "LLM_REFINE_MAX_TOKENS", 256, raising=False)
+    monkeypatch.setattr(llm_refine.config, "llm_timeout_seconds", lambda: 60.0, raising=False)
     monkeypatch.setattr(
         llm_refine.config,
         "describe_target_language",
@@ -186,6 +188,63 @@ async def test_perform_refine_maps_chat_errors(error, message):
     assert result["message"] == message
 
 
+@pytest.mark.asyncio
+async def test_perform_refine_retries_stalled_attempt(monkeypatch):
+    monkeypatch.setattr(llm_refine, "_attempt_timeout_seconds", lambda attempt: 0.01)
+    calls = []
+
+    async def chat(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            await llm_refine.asyncio.Event().wait()
+        return "<answer>__NO_CHANGE__</answer>"
+
+    result = await llm_refine.perform_refine(chat, "source", "draft", [], target_lang="zh")
+    assert result == {"status": "ok", "no_change": True}
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_perform_refine_reports_timeout_when_all_attempts_stall(monkeypatch):
+    monkeypatch.setattr(llm_refine, "_attempt_timeout_seconds", lambda attempt: 0.01)
+
+    async def chat(*args, **kwargs):
+        await llm_refine.asyncio.Event().wait()
+
+    result = await llm_refine.perform_refine(chat, "source", "draft", [], target_lang="zh")
+    assert result == {"status": "error", "message": "LLM request timed out", "no_change": True}
+
+
+@pytest.mark.asyncio
+async def test_perform_refine_memoizes_identical_requests():
+    calls = []
+
+    async def chat(*args, **kwargs):
+        calls.append(1)
+        return "<answer>fixed</answer><error>mistranslation</error>"
+
+    first = await llm_refine.perform_refine(chat, "source", "draft", [], target_lang="zh")
+    second = await llm_refine.perform_refine(chat, "source", "draft", [], target_lang="zh")
+    assert first == second
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_perform_refine_does_not_memoize_errors():
+    calls = []
+
+    async def chat(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise llm_refine.LlmError("bad key")
+        return "<answer>__NO_CHANGE__</answer>"
+
+    failed = await llm_refine.perform_refine(chat, "source", "draft", [], target_lang="zh")
+    retried = await llm_refine.perform_refine(chat, "source", "draft", [], target_lang="zh")
+    assert failed["status"] == "error"
+    assert retried == {"status": "ok", "no_change": True}
+
+
 @pytest.mark.asyncio
 async def test_perform_translate_retries_empty_and_placeholder_then_succeeds():
     replies = iter(["", "<answer>...translated text...</answer>", "<answer>```\n完成\n```</answer>"])
@@ -85,6 +85,7 @@ def _install_soniox_session_import_mocks(monkeypatch):
     llm_client.chat_completion = MagicMock()
     llm_client.extract_answer_tag = lambda text: text
     llm_client.LlmError = RuntimeError
+    llm_client.prewarm = MagicMock()
     monkeypatch.setitem(sys.modules, "llm_client", llm_client)
 
 
@@ -1278,6 +1279,40 @@ def test_hybrid_finalize_without_interim_translation_refines_stt_draft(monkeypat
     assert refined[-1]["refined_translation"] == "Refined STT draft."
 
 
+def test_hybrid_passthrough_draft_skips_refine_call(monkeypatch):
+    _install_soniox_session_import_mocks(monkeypatch)
+    import soniox_session as module
+
+    updates = []
+
+    async def broadcast(data):
+        updates.append(data)
+
+    monkeypatch.setattr(module.asyncio, "run_coroutine_threadsafe", _run_immediately)
+    monkeypatch.setattr(module, "is_llm_refine_available", lambda: True)
+
+    session = module.SonioxSession(MagicMock(), broadcast)
+    session.translation = "one_way"
+    session.translation_target_lang = "zh"
+    session.loop = object()
+    session._segment_mode = "punctuation"
+    session._llm_refine_mode = "refine"
+    session._suppress_soniox_translation = False
+
+    async def fake_refine(*args, **kwargs):
+        raise AssertionError("refine must not run when the draft echoes a target-language source")
+
+    session._perform_refine = fake_refine
+
+    _feed_original_and_translation(
+        session, "你好。", "你好。", source_language="zh", translation_language="zh"
+    )
+
+    refined = [u for u in updates if u.get("type") == "refine_result"]
+    assert refined[-1]["original_translation"] == "你好。"
+    assert refined[-1]["no_change"] is True
+
+
 def test_hybrid_immediate_finalize_after_translation_candidate_refines_stt_draft(monkeypatch):
     _install_soniox_session_import_mocks(monkeypatch)
     import soniox_session as module
@@ -61,6 +61,8 @@ class WebServer:
         self.session = session
         self.logger = logger
         self.websocket_clients = set()
+        # 每个客户端的有界发送队列（ws -> asyncio.Queue），慢客户端只丢自己的旧帧
+        self._client_queues = {}
         self.app_runner = None
         self.api_key_error_message = None # 新增属性
         self.window_on_top_callback = None
@@ -146,9 +148,16 @@ class WebServer:
     
     async def broadcast_to_clients(self, data: dict):
         """向所有连接的客户端广播数据"""
+        if not self._frontend_frame_log and not self.websocket_clients:
+            return
+
+        # 只序列化一次：帧日志和所有客户端共用同一份字符串。
+        # ensure_ascii=False 让 CJK 字幕按原始 UTF-8 发送而不是 \uXXXX 转义，载荷更小。
+        message = json.dumps(data, ensure_ascii=False)
+
         if self._frontend_frame_log:
             try:
-                self._frontend_frame_log.write(json.dumps(data, ensure_ascii=False) + "\n")
+                self._frontend_frame_log.write(message + "\n")
                 self._frontend_frame_log.flush()
             except Exception:
                 try:
@@ -157,14 +166,44 @@ class WebServer:
                     pass
                 self._frontend_frame_log = None
         if self.websocket_clients:
-            # 创建消息
-            message = json.dumps(data)
-            # 向所有客户端发送
-            await asyncio.gather(
-                *[client.send_str(message) for client in self.websocket_clients],
-                return_exceptions=True
-            )
-    
+            # 入队而不是直接 await 发送：一个慢客户端（如弱网下的手机页签）
+            # 只会挤掉自己队列里的旧帧，不会把广播方卡在它的 TCP 发送缓冲上
+            direct_sends = []
+            for client in self.websocket_clients:
+                if client.closed:
+                    continue
+                queue = self._client_queues.get(client)
+                if queue is None:
+                    # 没有注册写循环的连接（如测试桩）退回直接发送
+                    direct_sends.append(client.send_str(message))
+                    continue
+                try:
+                    queue.put_nowait(message)
+                except asyncio.QueueFull:
+                    # 队列满说明客户端追不上，丢最旧的一帧给新帧腾位置
+                    try:
+                        queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        pass
+                    try:
+                        queue.put_nowait(message)
+                    except asyncio.QueueFull:
+                        pass
+            if direct_sends:
+                await asyncio.gather(*direct_sends, return_exceptions=True)
+
+    async def _client_writer(self, ws, queue):
+        """单个客户端的发送循环：从自己的队列取帧逐条发出"""
+        try:
+            while not ws.closed:
+                message = await queue.get()
+                await ws.send_str(message)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            # 连接中断由 websocket_handler 的清理逻辑收尾
+            pass
+
     async def websocket_handler(self, request):
         """WebSocket处理函数"""
         ws = web.WebSocketResponse()
@@ -176,10 +215,13 @@ class WebServer:
             self.overlay_ws = ws
             print("Overlay window client connected via WebSocket.")
 
-        # 添加到客户端列表
+        # 添加到客户端列表，并为其启动独立的有界发送队列和写循环
         self.websocket_clients.add(ws)
+        send_queue = asyncio.Queue(maxsize=64)
+        self._client_queues[ws] = send_queue
+        writer_task = asyncio.create_task(self._client_writer(ws, send_queue))
         print(f"Client connected. Total clients: {len(self.websocket_clients)}")
-        
+
         try:
             connected = False
             if self.ipc_server is not None:
@@ -231,8 +273,10 @@ class WebServer:
                 if getattr(self, "overlay_ws", None) == ws:
                     self.overlay_ws = None
                     print("Overlay window client disconnected.")
-            # 从客户端列表移除
+            # 从客户端列表移除并停掉它的写循环
             self.websocket_clients.discard(ws)
+            self._client_queues.pop(ws, None)
+            writer_task.cancel()
             print(f"Client disconnected. Total clients: {len(self.websocket_clients)}")
         
         return ws